@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+from main_pipeline import atkinson_dither_packed, load_grayscale_image, save_1bit_png
+from src.curves.path_cache import cached_path
+from src.curves.registry import curve_names, get_curve
+from src.instrument import Profiler, count, set_profiler, stage
+from src.processing.bitimage import bit_entropy, packed_compressed_size
+
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff", ".pgm", ".ppm", ".webp"}
+
+
+# ----------------------------
+# Inputs
+# ----------------------------
+def collect_images(sources: list[str]) -> list[Path]:
+    """
+    Expand directories (non-recursive) and glob patterns into a sorted, de-duplicated list of images.
+    """
+    found: set[Path] = set()
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            candidates = path.iterdir()
+        else:
+            candidates = (Path(p) for p in glob.glob(source, recursive=True))
+        found.update(p for p in candidates if p.is_file() and p.suffix.lower() in IMAGE_SUFFIXES)
+    return sorted(found)
+
+
+def output_stems(images: list[Path]) -> dict[Path, str]:
+    """
+    Output name stem of every image: its file stem, plus a digest of its resolved path when
+    another image of the batch has the same stem (e.g. a/cat.png and b/cat.jpg), so that no
+    two images write to the same `{stem}_{curve}_1bit.png`. Stems are compared case-insensitively.
+    """
+    seen: dict[str, int] = {}
+    for image in images:
+        seen[image.stem.casefold()] = seen.get(image.stem.casefold(), 0) + 1
+    stems = {}
+    for image in images:
+        stem = image.stem
+        if seen[stem.casefold()] > 1:
+            digest = hashlib.blake2b(str(image.resolve()).encode(), digest_size=4).hexdigest()
+            stem = f"{stem}-{digest}"
+        stems[image] = stem
+    return stems
+
+
+# ----------------------------
+# Worker
+# ----------------------------
+def process_image(job: tuple[Path, str, Path, tuple[str, ...], tuple[int, int] | None, int | None, bool]
+                  ) -> tuple[list[dict], dict | None]:
+    """
+    Dither one image along every requested curve and return one metrics record per curve.
+    Runs in a pool worker: the path cache and diffusion-plan cache of the worker process
+    are reused from one image to the next. Dithered images stay packed (1 bit per pixel)
+    from the diffusion to the PNG and the metrics.
+
+    When the job carries a profile origin (a `time.time_ns()` value), the stages are
+    profiled on that shared timeline (with tracemalloc if `trace_memory`) and the events and
+    counters are returned as well.
+    """
+    image_path, stem, output_dir, curves, size, profile_origin, trace_memory = job
+    profiler = Profiler(enabled=profile_origin is not None, memory=trace_memory, origin_ns=profile_origin)
+    previous = set_profiler(profiler)
+    try:
+        records = _process_image(image_path, stem, output_dir, curves, size)
+    finally:
+        set_profiler(previous)
+        profiler.disable()
+    if profile_origin is None:
+        return records, None
+    return records, {"events": profiler.events, "counters": profiler.counters}
+
+
+def _process_image(image_path: Path, stem: str, output_dir: Path, curves: tuple[str, ...],
+                   size: tuple[int, int] | None) -> list[dict]:
+    with stage("load", image=image_path.name):
+        image = load_grayscale_image(image_path, size=size)
+    h, w = image.shape
+    records = []
+    for curve in curves:
+        start = time.perf_counter()
+        with stage("path", curve=curve):
+            path = cached_path(curve, w, h, get_curve(curve).order)
+        with stage("dither", curve=curve):
+            dithered = atkinson_dither_packed(image, path)
+        count("pixels_dithered", w * h)
+        out_path = output_dir / f"{stem}_{curve}_1bit.png"
+        with stage("png_encode", curve=curve):
+            save_1bit_png(dithered, out_path)
+        count("bytes_written", out_path.stat().st_size)
+        with stage("metrics", curve=curve):
+            entropy = bit_entropy(dithered)
+            gzip_bytes = packed_compressed_size(dithered)
+        records.append({
+            "image": str(image_path),
+            "curve": curve,
+            "width": w,
+            "height": h,
+            "output": str(out_path),
+            "entropy_bits_per_pixel": entropy,
+            "gzip_packed_bytes": gzip_bytes,
+            "seconds": time.perf_counter() - start,
+        })
+    return records
+
+
+# ----------------------------
+# Entry point
+# ----------------------------
+def write_records(results, out, profiler: Profiler | None = None) -> None:
+    """
+    Write the records of each finished job; profiled events and counters are merged into `profiler`.
+    """
+    for records, profile in results:
+        for record in records:
+            out.write(json.dumps(record) + "\n")
+        out.flush()
+        if profiler is not None and profile is not None:
+            profiler.events.extend(profile["events"])
+            for name, value in profile["counters"].items():
+                profiler.counters[name] = profiler.counters.get(name, 0) + value
+
+
+def parse_size(text: str) -> tuple[int, int]:
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Dither many images along space-filling curves.")
+    parser.add_argument("inputs", nargs="+", help="image directories or glob patterns")
+    parser.add_argument("-o", "--output-dir", type=Path, default=Path("data/output/batch"))
+    parser.add_argument("-c", "--curves", default="hilbert,raster",
+                        help=f"comma-separated curves among {', '.join(curve_names(2))} (default: hilbert,raster)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--size", type=parse_size, default=None,
+                        help="resize every image to WIDTHxHEIGHT first (default: keep native size)")
+    parser.add_argument("--metrics", type=Path, default=None,
+                        help="JSON-lines metrics file (default: <output-dir>/metrics.jsonl, '-' for stdout)")
+    parser.add_argument("--profile", type=Path, default=None,
+                        help="write a per-stage JSON profile merged over all workers")
+    parser.add_argument("--trace", type=Path, default=None,
+                        help="write a Chrome trace of all workers' stages")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="profile timings and RSS only: tracemalloc slows the per-pixel loops a lot")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    curves = tuple(c.strip() for c in args.curves.split(",") if c.strip())
+    unknown = [c for c in curves if c not in curve_names(2)]
+    if unknown:
+        print(f"Unknown curve(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    images = collect_images(args.inputs)
+    if not images:
+        print("No input images found.", file=sys.stderr)
+        return 1
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    profiler = Profiler() if args.profile is not None or args.trace is not None else None
+    origin = profiler.origin_ns if profiler is not None else None
+    stems = output_stems(images)
+    jobs = [(image, stems[image], args.output_dir, curves, args.size, origin, not args.no_tracemalloc)
+            for image in images]
+
+    metrics_path = args.metrics or args.output_dir / "metrics.jsonl"
+    out = sys.stdout if str(metrics_path) == "-" else open(metrics_path, "a", encoding="utf-8")
+    start = time.perf_counter()
+    try:
+        if args.workers <= 1:
+            write_records(map(process_image, jobs), out, profiler)
+        else:
+            with Pool(processes=min(args.workers, len(jobs))) as pool:
+                write_records(pool.imap_unordered(process_image, jobs), out, profiler)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if profiler is not None and args.profile is not None:
+        profiler.write_json(args.profile)
+    if profiler is not None and args.trace is not None:
+        profiler.write_chrome_trace(args.trace)
+
+    print(f"Processed {len(images)} image(s) x {len(curves)} curve(s) in {time.perf_counter() - start:.2f}s",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
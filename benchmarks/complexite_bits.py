@@ -2,7 +2,6 @@ import time
 import numpy as np
 from hilbertcurve.hilbertcurve import HilbertCurve
 import pymorton
-import matplotlib.pyplot as plt
 
 # Configuration
 dimensions = 3
@@ -35,30 +34,37 @@ def benchmark_morton(n_trials, bits):
     end = time.perf_counter()
     return (end - start) / n_trials  # time per call
 
-# Tests sur différentes tailles (bits = précision par dimension)
-bit_range = range(1, 11)
-n_trials = 10000
-hilbert_times = []
-morton_times = []
 
-for b in bit_range:
-    print(f"Testing for bits = {b}")
-    hilbert_time = benchmark_hilbertcurve(n_trials, b)
-    morton_time = benchmark_morton(n_trials, b)
-    hilbert_times.append(hilbert_time)
-    morton_times.append(morton_time)
+def main():
+    import matplotlib.pyplot as plt
 
-# Plot
-plt.figure(figsize=(8,5))
-plt.plot(bit_range, hilbert_times, label="HilbertCurve.distance_from_point", marker='o')
-plt.plot(bit_range, morton_times, label="pymorton.interleave3", marker='s')
-plt.xlabel("Bits (précision par dimension)")
-plt.ylabel("Temps moyen par appel (secondes)")
-plt.title("Benchmark Hilbert vs Morton")
-plt.grid(True)
-plt.legend()
-plt.tight_layout()
-plt.savefig("../data/output/benchmark_time_complexity.png", dpi=150, bbox_inches='tight')
-plt.savefig("benchmark_CRE.pdf")  # Keep PDF for archival
-plt.show()
+    # Tests sur différentes tailles (bits = précision par dimension)
+    bit_range = range(1, 11)
+    n_trials = 10000
+    hilbert_times = []
+    morton_times = []
 
+    for b in bit_range:
+        print(f"Testing for bits = {b}")
+        hilbert_time = benchmark_hilbertcurve(n_trials, b)
+        morton_time = benchmark_morton(n_trials, b)
+        hilbert_times.append(hilbert_time)
+        morton_times.append(morton_time)
+
+    # Plot
+    plt.figure(figsize=(8,5))
+    plt.plot(bit_range, hilbert_times, label="HilbertCurve.distance_from_point", marker='o')
+    plt.plot(bit_range, morton_times, label="pymorton.interleave3", marker='s')
+    plt.xlabel("Bits (précision par dimension)")
+    plt.ylabel("Temps moyen par appel (secondes)")
+    plt.title("Benchmark Hilbert vs Morton")
+    plt.grid(True)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig("../data/output/benchmark_time_complexity.png", dpi=150, bbox_inches='tight')
+    plt.savefig("benchmark_CRE.pdf")  # Keep PDF for archival
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
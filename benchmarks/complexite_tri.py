@@ -1,8 +1,6 @@
 import time
 import numpy as np
-import matplotlib.pyplot as plt
-from hilbertcurve.hilbertcurve import HilbertCurve
-import pymorton
+from src.processing.colour_curves import colour_order, key_table, unique_colours
 
 # Définir les composants de couleur (4 valeurs → 64 combinaisons)
 components = [0, 85, 170, 255]
@@ -26,21 +24,14 @@ def scan_order(colors):
             scan_ordered.extend(row[::-1])
     return scan_ordered
 
-# Hilbert
+# Hilbert et Morton : clés 3D sur 8 bits par canal, calculées en un seul lot
 def hilbert_order(colors):
-    hilbert = HilbertCurve(p=2, n=3)
-    color_to_index = {}
-    for color in colors:
-        scaled = tuple(c // 85 for c in color)
-        color_to_index[color] = hilbert.distance_from_point(scaled)
-    return sorted(colors, key=lambda c: color_to_index[c])
-
-# Morton
+    order = colour_order(np.array(colors, dtype=np.uint8), "hilbert3d")
+    return [colors[i] for i in order]
+
 def morton_order(colors):
-    def morton_key(c):
-        r, g, b = (c[0] // 85, c[1] // 85, c[2] // 85)
-        return pymorton.interleave3(int(r), int(g), int(b))
-    return sorted(colors, key=morton_key)
+    order = colour_order(np.array(colors, dtype=np.uint8), "morton3d")
+    return [colors[i] for i in order]
 
 # Benchmark d'une méthode
 def benchmark(method_fn, colors):
@@ -57,22 +48,41 @@ methods = {
     "Morton": morton_order
 }
 
-# Effectuer les mesures
-colors = generate_colors()
-results = {}
-
-for name, method in methods.items():
-    duration = benchmark(method, colors)
-    results[name] = duration
-    print(f"{name} trié en {duration:.6f} secondes.")
-
-# Affichage graphique
-plt.figure(figsize=(8,5))
-plt.bar(results.keys(), results.values(), color=['steelblue', 'orchid', 'orange', 'green'])
-plt.ylabel("Temps de tri (secondes)")
-plt.title("Temps de tri pour 64 couleurs RGB (4 valeurs / canal)")
-plt.grid(axis='y')
-plt.tight_layout()
-plt.savefig("../data/output/benchmark_sorting_comparison.png", dpi=150, bbox_inches='tight')
-plt.savefig("benchmark_sorting_comparison.pdf")  # Keep PDF for archival
-plt.show()
+
+def main():
+    import matplotlib.pyplot as plt
+
+    # Effectuer les mesures
+    colors = generate_colors()
+    results = {}
+
+    for name, method in methods.items():
+        duration = benchmark(method, colors)
+        results[name] = duration
+        print(f"{name} trié en {duration:.6f} secondes.")
+
+    # Passage à l'échelle : couleurs de N pixels aléatoires (tables de clés construites avant)
+    for curve in ("hilbert3d", "morton3d"):
+        key_table(curve)
+    rng = np.random.default_rng(0)
+    for n in (1 << 16, 1 << 20, 1 << 24):
+        pixels = rng.integers(0, 256, size=(n, 3), dtype=np.uint8)
+        for curve in ("hilbert3d", "morton3d"):
+            duree_tri = benchmark(lambda c: colour_order(c, curve), pixels)
+            duree_uniques = benchmark(lambda c: unique_colours(c, curve), pixels)
+            print(f"{n} pixels, {curve} : tri {duree_tri:.3f} s, couleurs distinctes triées {duree_uniques:.3f} s")
+
+    # Affichage graphique
+    plt.figure(figsize=(8,5))
+    plt.bar(results.keys(), results.values(), color=['steelblue', 'orchid', 'orange', 'green'])
+    plt.ylabel("Temps de tri (secondes)")
+    plt.title("Temps de tri pour 64 couleurs RGB (4 valeurs / canal)")
+    plt.grid(axis='y')
+    plt.tight_layout()
+    plt.savefig("../data/output/benchmark_sorting_comparison.png", dpi=150, bbox_inches='tight')
+    plt.savefig("benchmark_sorting_comparison.pdf")  # Keep PDF for archival
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from src.curves.registry import curve_names, curve_order
+from src.instrument import Profiler, count, set_profiler, stage
+from src.metrics.compression_matrix import compressed_size, curve_ordered_bytes
+from src.metrics.entropy_engine import traversal_entropy
+from src.processing.diffusion_plan import KERNELS, apply_plan_packed, build_plan
+
+
+# ----------------------------
+# Sweep configuration
+# ----------------------------
+DEFAULT_SIZES = (256, 512, 1024, 2048, 4096, 8192)
+DEFAULT_CURVES = ("hilbert", "gilbert", "morton", "peano", "raster")
+DEFAULT_KERNELS = tuple(KERNELS)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10
+BENCHES = ("path", "plan", "dither", "entropy", "compression")
+
+
+def test_image(size: int, seed: int = 0) -> np.ndarray:
+    """
+    Deterministic size x size grayscale test image in [0, 1]: a smooth gradient plus noise.
+    """
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size] / max(size - 1, 1)
+    image = 0.5 + 0.35 * np.sin(6 * x) * np.cos(4 * y) + 0.1 * rng.standard_normal((size, size))
+    return np.clip(image, 0, 1)
+
+
+# ----------------------------
+# Cases
+# ----------------------------
+# A case builder does the untimed setup for one (size, curve, kernel) and
+# returns the function to time. Kernels only matter for the diffusion cases.
+def _path_case(size: int, curve: str, kernel: str | None) -> Callable[[], object]:
+    return lambda: curve_order(curve, size, size)
+
+
+def _plan_case(size: int, curve: str, kernel: str | None) -> Callable[[], object]:
+    path = curve_order(curve, size, size)
+    return lambda: build_plan(path, size, size, kernel)
+
+
+def _dither_case(size: int, curve: str, kernel: str | None) -> Callable[[], object]:
+    plan = build_plan(curve_order(curve, size, size), size, size, kernel)
+    image = test_image(size)
+    return lambda: apply_plan_packed(plan, image)
+
+
+def _entropy_case(size: int, curve: str, kernel: str | None) -> Callable[[], object]:
+    path = curve_order(curve, size, size)
+    symbols = (test_image(size) > 0.5).astype(np.uint8)
+    return lambda: traversal_entropy(symbols, [path], max_order=2, alphabet=2)
+
+
+def _compression_case(size: int, curve: str, kernel: str | None) -> Callable[[], object]:
+    path = curve_order(curve, size, size)
+    image = test_image(size)
+    return lambda: compressed_size(curve_ordered_bytes(image, path), "zlib", 6)
+
+
+CASES: dict[str, tuple[Callable[[int, str, str | None], Callable[[], object]], bool]] = {
+    # name: (builder, depends on the kernel)
+    "path": (_path_case, False),
+    "plan": (_plan_case, True),
+    "dither": (_dither_case, True),
+    "entropy": (_entropy_case, False),
+    "compression": (_compression_case, False),
+}
+
+
+# ----------------------------
+# Measurement
+# ----------------------------
+def measure(fn: Callable[[], object], repeat: int, pixels: int) -> dict:
+    """
+    Time `repeat` calls of `fn`, then one extra call under tracemalloc for the peak
+    of Python and NumPy allocations (kept out of the timings, which it would slow down).
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(times)
+    return {
+        "times": times,
+        "min": min(times),
+        "median": median,
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "ns_per_pixel": median / pixels * 1e9,
+        "ns_per_pixel_min": min(times) / pixels * 1e9,
+        "peak_bytes": peak,
+    }
+
+
+def case_key(result: dict) -> tuple:
+    return result["bench"], result["size"], result["curve"], result["kernel"]
+
+
+def run_suite(benches: tuple[str, ...] = BENCHES, sizes: tuple[int, ...] = DEFAULT_SIZES,
+              curves: tuple[str, ...] = DEFAULT_CURVES, kernels: tuple[str, ...] = DEFAULT_KERNELS,
+              repeat: int = DEFAULT_REPEAT, log=sys.stderr) -> dict:
+    """
+    Run every (bench, size, curve, kernel) case and return the JSON-ready report.
+    """
+    results = []
+    for bench in benches:
+        builder, uses_kernel = CASES[bench]
+        for size in sizes:
+            for curve in curves:
+                for kernel in (kernels if uses_kernel else (None,)):
+                    with stage(f"{bench} setup", size=size, curve=curve, kernel=kernel):
+                        fn = builder(size, curve, kernel or DEFAULT_KERNELS[0])
+                    with stage(bench, size=size, curve=curve, kernel=kernel):
+                        stats = measure(fn, repeat, size * size)
+                    count("pixels", (repeat + 1) * size * size)
+                    result = {"bench": bench, "size": size, "curve": curve, "kernel": kernel,
+                              "pixels": size * size, "repeat": repeat, **stats}
+                    results.append(result)
+                    if log is not None:
+                        print(f"{bench:<12} {size:>5}^2 {curve:<8} {kernel or '-':<16} "
+                              f"{result['ns_per_pixel']:>10.1f} ns/px {result['peak_bytes'] / 2 ** 20:>9.1f} MiB",
+                              file=log, flush=True)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+# ----------------------------
+# Regression comparison
+# ----------------------------
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """
+    Compare the best-of-repeat ns/pixel case by case (less noisy than the median). A case
+    regresses when it is more than `threshold` (relative) slower than the baseline; cases
+    missing on one side are skipped.
+    """
+    base = {case_key(r): r for r in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        ref = base.get(case_key(result))
+        if ref is None:
+            continue
+        ratio = result["ns_per_pixel_min"] / ref["ns_per_pixel_min"] if ref["ns_per_pixel_min"] else float("inf")
+        rows.append({
+            "bench": result["bench"], "size": result["size"], "curve": result["curve"], "kernel": result["kernel"],
+            "baseline_ns_per_pixel": ref["ns_per_pixel_min"], "ns_per_pixel": result["ns_per_pixel_min"],
+            "ratio": ratio, "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def format_comparison(rows: list[dict]) -> str:
+    header = f"{'bench':<12} {'size':>5} {'curve':<8} {'kernel':<16} {'base ns/px':>11} {'ns/px':>11} {'ratio':>7}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        lines.append(f"{r['bench']:<12} {r['size']:>5} {r['curve']:<8} {r['kernel'] or '-':<16} "
+                     f"{r['baseline_ns_per_pixel']:>11.1f} {r['ns_per_pixel']:>11.1f} {r['ratio']:>7.2f}{flag}")
+    return "\n".join(lines)
+
+
+# ----------------------------
+# Plotting (optional)
+# ----------------------------
+def plot_report(report: dict, output: Path) -> None:
+    """
+    ns/pixel against image size, one panel per bench and one line per curve (and kernel).
+    Uses the non-interactive Agg backend, so it also works without a display.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    benches = sorted({r["bench"] for r in report["results"]}, key=BENCHES.index)
+    fig, axes = plt.subplots(1, len(benches), figsize=(4 * len(benches), 3.5), squeeze=False)
+    for ax, bench in zip(axes[0], benches):
+        series: dict[str, list[tuple[int, float]]] = {}
+        for r in report["results"]:
+            if r["bench"] == bench:
+                label = r["curve"] if r["kernel"] is None else f"{r['curve']}/{r['kernel']}"
+                series.setdefault(label, []).append((r["pixels"], r["ns_per_pixel"]))
+        for label, points in series.items():
+            points.sort()
+            ax.plot([p for p, _ in points], [v for _, v in points], marker="o", label=label)
+        ax.set_xscale("log")
+        ax.set_yscale("log")
+        ax.set_title(bench)
+        ax.set_xlabel("pixels")
+        ax.set_ylabel("ns / pixel")
+        ax.legend(fontsize=6)
+    fig.tight_layout()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(output, dpi=150)
+    plt.close(fig)
+
+
+# ----------------------------
+# Entry point
+# ----------------------------
+def _csv(text: str) -> tuple[str, ...]:
+    return tuple(item.strip() for item in text.split(",") if item.strip())
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark paths, dithering, entropy and compression.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the sweep and write a JSON report")
+    run.add_argument("-b", "--benches", type=_csv, default=BENCHES, help=f"among {', '.join(BENCHES)}")
+    run.add_argument("-s", "--sizes", type=lambda t: tuple(int(v) for v in _csv(t)), default=DEFAULT_SIZES,
+                     help="comma-separated square sizes (default: 256..8192)")
+    run.add_argument("-c", "--curves", type=_csv, default=DEFAULT_CURVES, help=f"among {', '.join(curve_names(2))}")
+    run.add_argument("-k", "--kernels", type=_csv, default=DEFAULT_KERNELS, help=f"among {', '.join(KERNELS)}")
+    run.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT)
+    run.add_argument("-o", "--output", type=Path, default=None, help="JSON report (default: stdout)")
+    run.add_argument("--plot", type=Path, default=None, help="also save a plot of the report (PNG/PDF)")
+    run.add_argument("--trace", type=Path, default=None, help="also write a Chrome trace of the cases")
+
+    cmp_ = sub.add_parser("compare", help="flag regressions of a report against a baseline")
+    cmp_.add_argument("baseline", type=Path)
+    cmp_.add_argument("current", type=Path)
+    cmp_.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD,
+                      help="relative slowdown that counts as a regression (default: 0.10)")
+
+    plot = sub.add_parser("plot", help="plot a JSON report")
+    plot.add_argument("report", type=Path)
+    plot.add_argument("-o", "--output", type=Path, default=Path("data/output/benchmark_suite.png"))
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.command == "run":
+        unknown = [b for b in args.benches if b not in CASES] + [c for c in args.curves if c not in curve_names(2)] \
+            + [k for k in args.kernels if k not in KERNELS]
+        if unknown:
+            print(f"Unknown bench/curve/kernel: {', '.join(unknown)}", file=sys.stderr)
+            return 2
+        # Memory is already measured per case; the trace only records timings.
+        profiler = Profiler(enabled=args.trace is not None, memory=False)
+        previous = set_profiler(profiler)
+        try:
+            report = run_suite(args.benches, args.sizes, args.curves, args.kernels, args.repeat)
+        finally:
+            set_profiler(previous)
+        if args.trace is not None:
+            profiler.write_chrome_trace(args.trace)
+        text = json.dumps(report, indent=1)
+        if args.output is None:
+            print(text)
+        else:
+            args.output.parent.mkdir(parents=True, exist_ok=True)
+            args.output.write_text(text + "\n", encoding="utf-8")
+        if args.plot is not None:
+            plot_report(report, args.plot)
+        return 0
+
+    if args.command == "compare":
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        current = json.loads(args.current.read_text(encoding="utf-8"))
+        rows = compare(baseline, current, args.threshold)
+        print(format_comparison(rows))
+        regressions = sum(r["regression"] for r in rows)
+        print(f"{regressions} regression(s) out of {len(rows)} case(s)", file=sys.stderr)
+        return 1 if regressions else 0
+
+    plot_report(json.loads(args.report.read_text(encoding="utf-8")), args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,104 +1,105 @@
 from __future__ import annotations
 
+import argparse
 import os
 from pathlib import Path
 import gzip
 import numpy as np
 from PIL import Image
-from scipy.stats import entropy as shannon_entropy
-from hilbertcurve.hilbertcurve import HilbertCurve
+
+from src.curves.path_cache import cached_path
+from src.curves.registry import curve_order
+from src.instrument import Profiler, count, set_profiler, stage
+from src.metrics.entropy_engine import conditional_entropy, entropy_bits_per_symbol, quantize01, symbols_along
+from src.processing.bitimage import (BitImage, bit_entropy, bits_along, pack_image, packed_compressed_size,
+                                     save_bit_image)
+from src.processing.diffusion_plan import apply_plan, apply_plan_packed, get_plan
 
 
 # ----------------------------
 # I/O utilities
 # ----------------------------
-def load_grayscale_image(path: str | Path, size: tuple[int, int] = (256, 256)) -> np.ndarray:
+def load_grayscale_image(path: str | Path, size: tuple[int, int] | None = (256, 256)) -> np.ndarray:
     """
-    Load an image as grayscale in [0, 1], resized to `size`.
+    Load an image as grayscale in [0, 1], resized to `size` (kept at its native size if None).
     If the file does not exist, generate a synthetic grayscale gradient.
     """
     path = Path(path)
     if path.exists():
-        img = Image.open(path).convert("L").resize(size)
+        img = Image.open(path).convert("L")
+        if size is not None:
+            img = img.resize(size)
     else:
-        width, height = size
+        width, height = size or (256, 256)
         gradient = np.tile(np.linspace(0, 255, width, dtype=np.uint8), (height, 1))
         img = Image.fromarray(gradient, mode="L")
 
     return np.asarray(img, dtype=np.float32) / 255.0
 
 
-def save_1bit_png(image01: np.ndarray, path: str | Path) -> None:
+def save_1bit_png(image01: np.ndarray | BitImage, path: str | Path) -> None:
     """
-    Save a binary (0/1) image as a true 1-bit PNG.
+    Save a binary (0/1) image, or an already packed `BitImage`, as a true 1-bit PNG.
     """
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-
-    img = Image.fromarray((image01 > 0.5).astype(np.uint8) * 255, mode="L")
-    img_1bit = img.convert("1")
-    img_1bit.save(path, compress_level=0)
+    if not isinstance(image01, BitImage):
+        image01 = pack_image(image01)
+    save_bit_image(image01, path)
 
 
 # ----------------------------
 # Space-filling paths
 # ----------------------------
-def hilbert_path(width: int, height: int) -> list[tuple[int, int]]:
+def hilbert_path(width: int, height: int) -> np.ndarray:
+    """
+    Return pixel coordinates ordered by 2D Hilbert curve (covering the smallest power-of-two square),
+    as an (width * height, 2) int32 array of (x, y) generated by the table-driven decoder.
+    """
+    return curve_order("hilbert", width, height)
+
+
+def gilbert_path(width: int, height: int) -> np.ndarray:
     """
-    Return pixel coordinates ordered by 2D Hilbert curve (covering the smallest power-of-two square).
+    Return pixel coordinates ordered by the generalized Hilbert curve of the width x height rectangle,
+    as an (width * height, 2) int32 array of (x, y). No power-of-two padding: cost is linear in pixels.
     """
-    n = max(width, height)
-    p = 1
-    order = 0
-    while p < n:
-        p <<= 1
-        order += 1
+    return curve_order("gilbert", width, height)
 
-    curve = HilbertCurve(order, 2)
-    coords = []
-    for y in range(p):
-        for x in range(p):
-            d = curve.distance_from_point([x, y])
-            if 0 <= x < width and 0 <= y < height:
-                coords.append((d, x, y))
 
-    coords.sort(key=lambda t: t[0])
-    return [(x, y) for _, x, y in coords]
+def peano_path(width: int, height: int) -> np.ndarray:
+    """
+    Return pixel coordinates ordered by the Peano curve (covering the smallest power-of-three square),
+    as an (width * height, 2) int32 array of (x, y).
+    """
+    return curve_order("peano", width, height)
 
 
-def raster_path(width: int, height: int) -> list[tuple[int, int]]:
+def raster_path(width: int, height: int) -> np.ndarray:
     """
-    Standard left-to-right, top-to-bottom raster scan.
+    Standard left-to-right, top-to-bottom raster scan, as an (width * height, 2) int32 array of (x, y).
     """
-    return [(x, y) for y in range(height) for x in range(width)]
+    return curve_order("raster", width, height)
 
 
 # ----------------------------
 # Dithering
 # ----------------------------
-def atkinson_dither_grayscale(image01: np.ndarray, path: list[tuple[int, int]]) -> np.ndarray:
+def atkinson_dither_grayscale(image01: np.ndarray, path: np.ndarray | list[tuple[int, int]]) -> np.ndarray:
     """
     Atkinson error diffusion dithering following a given pixel traversal path.
-    Input/output in {0,1} with internal error propagation on float copy.
+    Input/output in {0,1}; the bounds-checked neighbour schedule is precompiled
+    once per (path, size) into a cached diffusion plan.
     """
     h, w = image01.shape
-    work = image01.copy()
-    out = np.zeros_like(work)
-
-    neighbors = [(1, 0), (2, 0), (-1, 1), (0, 1), (1, 1), (0, 2)]
+    return apply_plan(get_plan(path, w, h, "atkinson"), image01)
 
-    for x, y in path:
-        old = work[y, x]
-        new = 1.0 if old > 0.5 else 0.0
-        out[y, x] = new
 
-        err = (old - new) / 8.0
-        for dx, dy in neighbors:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < w and 0 <= ny < h:
-                work[ny, nx] += err
-
-    return out
+def atkinson_dither_packed(image01: np.ndarray, path: np.ndarray | list[tuple[int, int]]) -> BitImage:
+    """
+    Same dithering as `atkinson_dither_grayscale`, written directly as packed bits
+    (8 pixels per byte) instead of a float array.
+    """
+    h, w = image01.shape
+    return BitImage(w, apply_plan_packed(get_plan(path, w, h, "atkinson"), image01))
 
 
 # ----------------------------
@@ -108,9 +109,19 @@ def shannon_entropy_bits_per_pixel(image01: np.ndarray) -> float:
     """
     Shannon entropy (bits/pixel) estimated from a 256-bin histogram over [0,1].
     """
-    hist, _ = np.histogram(image01.flatten(), bins=256, range=(0, 1), density=True)
-    hist = hist[hist > 0]
-    return float(shannon_entropy(hist, base=2))
+    return float(entropy_bits_per_symbol(quantize01(image01).ravel(), 256))
+
+
+def conditional_entropy_along(image01: np.ndarray | BitImage, path: np.ndarray | list[tuple[int, int]],
+                              order: int = 1) -> float:
+    """
+    Order-k conditional entropy (bits/pixel) of the pixels read along `path`: 256-bin
+    symbols of an image in [0, 1], or the bits of a packed `BitImage`.
+    Unlike the histogram entropy, it depends on the traversal.
+    """
+    if isinstance(image01, BitImage):
+        return float(conditional_entropy(bits_along(image01, path), order, 2))
+    return float(conditional_entropy(symbols_along(quantize01(image01), [path])[0, 0], order, 256))
 
 
 def gzip_size_bytes_of_raw_u8(image01: np.ndarray) -> int:
@@ -124,35 +135,77 @@ def gzip_size_bytes_of_raw_u8(image01: np.ndarray) -> int:
 # ----------------------------
 # Main demo
 # ----------------------------
-def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Hilbert vs raster dithering and compression demo.")
+    parser.add_argument("--profile", type=Path, default=None,
+                        help="write a per-stage JSON profile (time, tracemalloc/RSS peaks, counters)")
+    parser.add_argument("--trace", type=Path, default=None,
+                        help="write a Chrome trace (chrome://tracing, Perfetto) of the stages")
+    parser.add_argument("--no-tracemalloc", action="store_true",
+                        help="profile timings and RSS only: tracemalloc slows the per-pixel loops a lot")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    profiler = Profiler(enabled=args.profile is not None or args.trace is not None, memory=not args.no_tracemalloc)
+    previous = set_profiler(profiler)
+    try:
+        run_demo()
+    finally:
+        set_profiler(previous)
+        profiler.disable()
+    if args.profile is not None:
+        profiler.write_json(args.profile)
+    if args.trace is not None:
+        profiler.write_chrome_trace(args.trace)
+
+
+def run_demo() -> None:
     input_path = Path("data/input/hopper.png")
     output_dir = Path("data/output")
 
     print("=== TIPE Demo: Hilbert traversal for dithering & compression ===")
-    image = load_grayscale_image(input_path, size=(256, 256))
+    with stage("load"):
+        image = load_grayscale_image(input_path, size=(256, 256))
     h, w = image.shape
     print(f"Loaded image shape: {image.shape}")
 
     print("Building traversal paths...")
-    path_h = hilbert_path(w, h)
-    path_r = raster_path(w, h)
+    with stage("path", curve="hilbert"):
+        path_h = cached_path("hilbert", w, h, hilbert_path)
+    with stage("path", curve="raster"):
+        path_r = cached_path("raster", w, h, raster_path)
 
+    # Dithered images stay packed (1 bit per pixel) from the diffusion to the PNG and the metrics.
     print("Running Atkinson dithering...")
-    d_h = atkinson_dither_grayscale(image, path_h)
-    d_r = atkinson_dither_grayscale(image, path_r)
+    with stage("dither", curve="hilbert"):
+        d_h = atkinson_dither_packed(image, path_h)
+    with stage("dither", curve="raster"):
+        d_r = atkinson_dither_packed(image, path_r)
+    count("pixels_dithered", 2 * w * h)
 
     print("Saving outputs...")
-    save_1bit_png(d_h, output_dir / "dither_hilbert_1bit.png")
-    save_1bit_png(d_r, output_dir / "dither_raster_1bit.png")
+    with stage("png_encode"):
+        for dithered, name in ((d_h, "dither_hilbert_1bit.png"), (d_r, "dither_raster_1bit.png")):
+            save_1bit_png(dithered, output_dir / name)
+            count("bytes_written", (output_dir / name).stat().st_size)
 
     print("\n--- Metrics (dithered images) ---")
-    ent_h = shannon_entropy_bits_per_pixel(d_h)
-    ent_r = shannon_entropy_bits_per_pixel(d_r)
-    gz_h = gzip_size_bytes_of_raw_u8(d_h)
-    gz_r = gzip_size_bytes_of_raw_u8(d_r)
-
-    print(f"Raster  : entropy={ent_r:.4f} bits/pixel | gzip(raw)={gz_r} bytes")
-    print(f"Hilbert : entropy={ent_h:.4f} bits/pixel | gzip(raw)={gz_h} bytes")
+    with stage("entropy"):
+        ent_h = bit_entropy(d_h)
+        ent_r = bit_entropy(d_r)
+        cond_h = conditional_entropy_along(d_h, path_h)
+        cond_r = conditional_entropy_along(d_r, path_r)
+    with stage("gzip"):
+        gz_h = packed_compressed_size(d_h, "gzip")
+        gz_r = packed_compressed_size(d_r, "gzip")
+    count("bytes_compressed", d_h.nbytes + d_r.nbytes)
+
+    print(f"Raster  : entropy={ent_r:.4f} bits/pixel | order-1 along curve={cond_r:.4f} bits/pixel "
+          f"| gzip(packed)={gz_r} bytes")
+    print(f"Hilbert : entropy={ent_h:.4f} bits/pixel | order-1 along curve={cond_h:.4f} bits/pixel "
+          f"| gzip(packed)={gz_h} bytes")
 
     if gz_r > 0:
         gain = 100.0 * (gz_r - gz_h) / gz_r
@@ -160,7 +213,7 @@ def main() -> None:
 
     raw_gray_bytes = w * h  # 1 byte per pixel (uint8 grayscale)
     global_reduction = 100.0 * (raw_gray_bytes - gz_h) / raw_gray_bytes
-    print(f"Global reduction vs raw 8-bit grayscale (Hilbert dither + gzip): {global_reduction:.2f}%")
+    print(f"Global reduction vs raw 8-bit grayscale (packed Hilbert dither + gzip): {global_reduction:.2f}%")
 
 
 if __name__ == "__main__":
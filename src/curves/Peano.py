@@ -1,6 +1,5 @@
-import matplotlib.pyplot as plt
 import numpy as np
-from LSpaceCurves import peano_curve
+from src.curves.registry import get_curve
 
 def generer_courbe_peano(ordre):
     """
@@ -12,35 +11,38 @@ def generer_courbe_peano(ordre):
     Returns:
         tuple: Un tuple contenant deux listes, les coordonnées x et y de la courbe.
     """
-    # Utilise le module 'fractal' pour générer la courbe de Peano
-    # La fonction 'peano_curve' retourne une liste de points (x, y)
-    points_peano = peano_curve(p)
+    # Décode les 9**ordre indices de la courbe en coordonnées (x, y)
+    coordonnees = get_curve("peano").decode(np.arange(9 ** ordre), 3 ** ordre)
 
-    # Sépare les coordonnées x et y
-    coordonnees_x = [p[0] for p in points_peano]
-    coordonnees_y = [p[1] for p in points_peano]
+    return coordonnees[:, 0].tolist(), coordonnees[:, 1].tolist()
 
-    return coordonnees_x, coordonnees_y
 
-# Définition de l'ordre de la courbe de Peano
-ordre_peano = 3
+def main():
+    import matplotlib.pyplot as plt
 
-# Génération des points de la courbe de Peano
-x_points, y_points = generer_courbe_peano(ordre_peano)
+    # Définition de l'ordre de la courbe de Peano
+    ordre_peano = 3
 
-# Création de la figure et du tracé
-plt.figure(figsize=(8, 8)) # Définit la taille de la figure pour un aspect carré
-plt.plot(x_points, y_points, 'b-', linewidth=1, marker='o', markersize=2, alpha=0.8) # Tracé en bleu
+    # Génération des points de la courbe de Peano
+    x_points, y_points = generer_courbe_peano(ordre_peano)
 
-# Désactive les axes pour une meilleure visualisation de la courbe
-plt.axis('off')
-# Assure que les échelles des axes sont égales pour éviter la distorsion
-plt.axis('equal')
-# Ajuste la mise en page pour que tout le contenu soit visible
-plt.tight_layout()
+    # Création de la figure et du tracé
+    plt.figure(figsize=(8, 8)) # Définit la taille de la figure pour un aspect carré
+    plt.plot(x_points, y_points, 'b-', linewidth=1, marker='o', markersize=2, alpha=0.8) # Tracé en bleu
 
-# Sauvegarde le graphique au format PDF
-plt.savefig(f"Peano{ordre_peano}.pdf", facecolor='white', bbox_inches="tight")
+    # Désactive les axes pour une meilleure visualisation de la courbe
+    plt.axis('off')
+    # Assure que les échelles des axes sont égales pour éviter la distorsion
+    plt.axis('equal')
+    # Ajuste la mise en page pour que tout le contenu soit visible
+    plt.tight_layout()
 
-# Ferme la figure pour libérer la mémoire
-plt.close()
+    # Sauvegarde le graphique au format PDF
+    plt.savefig(f"Peano{ordre_peano}.pdf", facecolor='white', bbox_inches="tight")
+
+    # Ferme la figure pour libérer la mémoire
+    plt.close()
+
+
+if __name__ == "__main__":
+    main()
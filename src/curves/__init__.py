@@ -1,4 +1,3 @@
-python
 """
 Projet TIPE : Courbes Remplissant l'Espace (CRE) et Traitement d'Images
 """
@@ -6,3 +5,58 @@ Projet TIPE : Courbes Remplissant l'Espace (CRE) et Traitement d'Images
 __version__ = "1.0.0"
 __author__ = "Sami Ennedoui"
 __description__ = "Application des parcours fractals (Hilbert, Morton) au tramage et à la compression d'images."
+
+
+# Public functions, re-exported lazily (PEP 562): importing the package loads
+# nothing but this table, and `from src.curves import hilbert_order` imports only
+# the module that defines it. The experiment scripts next to these modules
+# are not part of the API and only run through their `main()`.
+_EXPORTS = {
+    "hilbert_order_for": "hilbert_lut",
+    "hilbert_decode": "hilbert_lut",
+    "hilbert_encode": "hilbert_lut",
+    "iter_hilbert_order": "hilbert_lut",
+    "hilbert_order": "hilbert_lut",
+    "iter_gilbert_order": "gilbert",
+    "gilbert_order": "gilbert",
+    "interleave2": "morton_bits",
+    "deinterleave2": "morton_bits",
+    "interleave3": "morton_bits",
+    "deinterleave3": "morton_bits",
+    "iter_morton_order": "morton_bits",
+    "morton_order": "morton_bits",
+    "peano_level_for": "peano_vec",
+    "peano_decode": "peano_vec",
+    "peano_encode": "peano_vec",
+    "iter_peano_order": "peano_vec",
+    "peano_order": "peano_vec",
+    "order3d_for": "curves3d",
+    "hilbert3d_decode": "curves3d",
+    "hilbert3d_encode": "curves3d",
+    "morton3d_decode": "curves3d",
+    "morton3d_encode": "curves3d",
+    "iter_volume_order": "curves3d",
+    "volume_order": "curves3d",
+    "cached_path": "path_cache",
+    "register_curve": "registry",
+    "get_curve": "registry",
+    "curve_names": "registry",
+    "curve_order": "registry",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
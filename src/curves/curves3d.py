@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+
+from src.curves.morton_bits import deinterleave3, interleave3
+
+
+# ----------------------------
+# 3D Hilbert state machine
+# ----------------------------
+# `hilbertcurve.HilbertCurve(order, 3)` is self-similar: the sub-curve in octant
+# j is the order-1 smaller curve transformed by a fixed cube symmetry. A
+# symmetry is stored as (perm, flips) and maps a point p to q with
+# q[a] = p[perm[a]], reflected along axis a when flips[a] is set. The state of
+# the automaton is the symmetry accumulated from the root, so decoding is one
+# table lookup per base-8 digit, as for the 2D tables in `hilbert_lut`.
+_OCTANTS = ((0, 0, 0), (0, 0, 1), (0, 1, 1), (0, 1, 0), (1, 1, 0), (1, 1, 1), (1, 0, 1), (1, 0, 0))
+_CHILDREN = (
+    ((1, 2, 0), (0, 0, 0)), ((1, 0, 2), (0, 0, 0)), ((0, 1, 2), (0, 0, 0)), ((2, 1, 0), (1, 0, 1)),
+    ((2, 1, 0), (0, 0, 0)), ((0, 1, 2), (0, 0, 0)), ((1, 0, 2), (1, 1, 0)), ((1, 2, 0), (1, 0, 1)),
+)
+
+
+def _compose(outer: tuple, inner: tuple) -> tuple:
+    """
+    Symmetry applying `inner` first, then `outer`.
+    """
+    perm_o, flip_o = outer
+    perm_i, flip_i = inner
+    return (tuple(perm_i[perm_o[a]] for a in range(3)),
+            tuple(flip_o[a] ^ flip_i[perm_o[a]] for a in range(3)))
+
+
+def _apply_bits(sym: tuple, point: tuple[int, int, int]) -> tuple[int, int, int]:
+    perm, flips = sym
+    return tuple(point[perm[a]] ^ flips[a] for a in range(3))
+
+
+def _build_tables() -> tuple[list[tuple], np.ndarray, np.ndarray, np.ndarray]:
+    states = [((0, 1, 2), (0, 0, 0))]
+    index = {states[0]: 0}
+    rows = []
+    i = 0
+    while i < len(states):
+        for digit in range(8):
+            child = _compose(states[i], _CHILDREN[digit])
+            if child not in index:
+                index[child] = len(states)
+                states.append(child)
+            qx, qy, qz = _apply_bits(states[i], _OCTANTS[digit])
+            rows.append((qx << 2 | qy << 1 | qz, index[child]))
+        i += 1
+    octant = np.array([r[0] for r in rows], dtype=np.uint8)
+    following = np.array([r[1] for r in rows], dtype=np.uint8)
+    # Inverse tables, row `state * 8 + octant` -> (digit, next state).
+    digit = np.zeros(len(rows), dtype=np.uint8)
+    digit[np.arange(len(states)).repeat(8) * 8 + octant] = np.tile(np.arange(8, dtype=np.uint8), len(states))
+    return states, octant, following, digit
+
+
+# Row `state * 8 + digit` -> (octant bits x << 2 | y << 1 | z, next state).
+_STATES, _DECODE_OCTANT, _DECODE_NEXT, _ENCODE_DIGIT = _build_tables()
+_ENCODE_NEXT = np.zeros_like(_DECODE_NEXT)
+_ENCODE_NEXT[np.arange(len(_STATES)).repeat(8) * 8 + _DECODE_OCTANT] = _DECODE_NEXT
+
+# Morton order is the same traversal with a single state and x as the low bit of each digit.
+_MORTON_OCTANT = np.array([(d & 1) << 2 | (d >> 1 & 1) << 1 | d >> 2 for d in range(8)], dtype=np.uint8)
+
+DEFAULT_CHUNK = 1 << 20
+_LEAF = 1 << 12
+
+
+def order3d_for(width: int, height: int, depth: int) -> int:
+    """
+    Smallest order p such that the 2^p cube covers width x height x depth.
+    """
+    n = max(width, height, depth)
+    order = 0
+    while (1 << order) < n:
+        order += 1
+    return order
+
+
+# ----------------------------
+# Batch encode / decode
+# ----------------------------
+def hilbert3d_decode(d: np.ndarray, order: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Map 3D Hilbert indices to (x, y, z) on the 2^order cube (order <= 21), on whole arrays.
+    Same points as `HilbertCurve(order, 3).point_from_distance`.
+    """
+    d = np.asarray(d, dtype=np.uint64)
+    x = np.zeros(d.shape, dtype=np.uint32)
+    y = np.zeros(d.shape, dtype=np.uint32)
+    z = np.zeros(d.shape, dtype=np.uint32)
+    state = np.zeros(d.shape, dtype=np.uint8)
+    for level in range(order - 1, -1, -1):
+        row = state * np.uint8(8) + ((d >> np.uint64(3 * level)) & np.uint64(7)).astype(np.uint8)
+        octant = _DECODE_OCTANT[row].astype(np.uint32)
+        x |= (octant >> np.uint32(2)) << np.uint32(level)
+        y |= ((octant >> np.uint32(1)) & np.uint32(1)) << np.uint32(level)
+        z |= (octant & np.uint32(1)) << np.uint32(level)
+        state = _DECODE_NEXT[row]
+    return x, y, z
+
+
+def hilbert3d_encode(x: np.ndarray, y: np.ndarray, z: np.ndarray, order: int) -> np.ndarray:
+    """
+    Map (x, y, z) on the 2^order cube to 3D Hilbert indices (uint64), on whole arrays.
+    """
+    x, y, z = np.broadcast_arrays(*(np.asarray(v, dtype=np.uint64) for v in (x, y, z)))
+    d = np.zeros(x.shape, dtype=np.uint64)
+    state = np.zeros(x.shape, dtype=np.uint8)
+    one = np.uint64(1)
+    for level in range(order - 1, -1, -1):
+        shift = np.uint64(level)
+        octant = (((x >> shift) & one) << np.uint64(2) | ((y >> shift) & one) << one
+                  | ((z >> shift) & one)).astype(np.uint8)
+        row = state * np.uint8(8) + octant
+        d = (d << np.uint64(3)) | _ENCODE_DIGIT[row].astype(np.uint64)
+        state = _ENCODE_NEXT[row]
+    return d
+
+
+def morton3d_decode(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Map 3D Morton codes to (x, y, z); `morton_bits.deinterleave3`.
+    """
+    return deinterleave3(codes)
+
+
+def morton3d_encode(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """
+    3D Morton codes (uint64, 21 bits per axis); `morton_bits.interleave3`.
+    """
+    return interleave3(x, y, z, np.uint64)
+
+
+# ----------------------------
+# Traversal generators
+# ----------------------------
+def _templates(curve: str, level: int) -> np.ndarray:
+    """
+    Traversal of a 2^level cube from state 0, as (8^level, 3) int32.
+    """
+    d = np.arange(8 ** level, dtype=np.uint64)
+    if curve == "hilbert":
+        x, y, z = hilbert3d_decode(d, level)
+    else:
+        x, y, z = deinterleave3(d)
+    return np.stack([x, y, z], axis=1).astype(np.int32)
+
+
+def _transform(template: np.ndarray, state: int, side: int) -> np.ndarray:
+    perm, flips = _STATES[state]
+    out = template[:, list(perm)]
+    for a in range(3):
+        if flips[a]:
+            out[:, a] = side - 1 - out[:, a]
+    return out
+
+
+def _iter_blocks(curve: str, bx: int, by: int, bz: int, level: int, state: int,
+                 box: tuple[int, int, int], leaf: int, templates: list[np.ndarray]) -> Iterator[np.ndarray]:
+    side = 1 << level
+    width, height, depth = box
+    if bx >= width or by >= height or bz >= depth:
+        return
+    inside = bx + side <= width and by + side <= height and bz + side <= depth
+    if level <= leaf and (inside or side ** 3 <= _LEAF):
+        block = templates[level] if state == 0 else _transform(templates[level], state, side)
+        block = block + np.array([bx, by, bz], dtype=np.int32)
+        if not inside:
+            block = block[(block[:, 0] < width) & (block[:, 1] < height) & (block[:, 2] < depth)]
+        yield block
+        return
+    half = side >> 1
+    octants, following = (_DECODE_OCTANT, _DECODE_NEXT) if curve == "hilbert" else (_MORTON_OCTANT, None)
+    for digit in range(8):
+        row = state * 8 + digit
+        octant = int(octants[row])
+        child = int(following[row]) if following is not None else 0
+        yield from _iter_blocks(curve, bx + (octant >> 2) * half, by + (octant >> 1 & 1) * half,
+                                bz + (octant & 1) * half, level - 1, child, box, leaf, templates)
+
+
+def iter_volume_order(width: int, height: int, depth: int, curve: str = "hilbert",
+                      chunk: int = DEFAULT_CHUNK) -> Iterator[np.ndarray]:
+    """
+    Yield the 3D Hilbert or Morton traversal of a width x height x depth box (cropped from
+    the covering 2^p cube) as int32 arrays of (x, y, z), in curve order.
+
+    Octree blocks fully inside the box are emitted by transforming one template per level,
+    blocks outside are skipped and only small edge blocks are masked; every yielded array
+    holds about `chunk` voxels, so memory stays bounded whatever the volume.
+    """
+    if curve not in ("hilbert", "morton"):
+        raise ValueError(f"unknown 3D curve {curve!r}, expected 'hilbert' or 'morton'")
+    if width <= 0 or height <= 0 or depth <= 0:
+        return
+    order = order3d_for(width, height, depth)
+    leaf = 0
+    while leaf < order and 8 ** (leaf + 1) <= chunk:
+        leaf += 1
+    templates = [_templates(curve, j) for j in range(leaf + 1)]
+
+    pending: list[np.ndarray] = []
+    size = 0
+    for block in _iter_blocks(curve, 0, 0, 0, order, 0, (width, height, depth), leaf, templates):
+        pending.append(block)
+        size += len(block)
+        if size >= chunk:
+            yield np.concatenate(pending)
+            pending, size = [], 0
+    if pending:
+        yield np.concatenate(pending)
+
+
+def volume_order(width: int, height: int, depth: int, curve: str = "hilbert",
+                 chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+    """
+    Voxel coordinates of a width x height x depth box along the 3D Hilbert or Morton curve,
+    as a (width * height * depth, 3) int32 array of (x, y, z).
+    """
+    parts = list(iter_volume_order(width, height, depth, curve, chunk))
+    if not parts:
+        return np.empty((0, 3), dtype=np.int32)
+    return np.concatenate(parts)
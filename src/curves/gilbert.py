@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+
+
+# ----------------------------
+# Generalized Hilbert ("gilbert") curve
+# ----------------------------
+# Recursive construction of J. Červený's gilbert2d: a w x h rectangle spanned by
+# the axis vectors a (length w) and b (length h) is split into two or three
+# sub-rectangles, each traversed Hilbert-like, until it degenerates into a
+# single row or column. Every pixel is visited exactly once; steps are unit
+# steps, except for a single diagonal one that some odd sizes cannot avoid.
+#
+# The traversal of a sub-rectangle, taken relative to its starting pixel,
+# depends only on (a, b). Blocks are therefore memoized on the axis vectors and
+# shifted into place, so only a handful of distinct blocks per recursion level
+# are ever built, each with whole-array NumPy operations.
+DEFAULT_CHUNK = 1 << 20
+
+
+def _sgn(v: int) -> int:
+    return (v > 0) - (v < 0)
+
+
+def _split(ax: int, ay: int, bx: int, by: int) -> list[tuple[int, int, int, int, int, int]]:
+    """
+    Sub-rectangles (origin offset x, y, then a and b) of a block with at least two rows and columns.
+    """
+    w, h = abs(ax + ay), abs(bx + by)
+    dax, day = _sgn(ax), _sgn(ay)
+    dbx, dby = _sgn(bx), _sgn(by)
+    ax2, ay2 = ax // 2, ay // 2
+    bx2, by2 = bx // 2, by // 2
+    w2, h2 = abs(ax2 + ay2), abs(bx2 + by2)
+
+    if 2 * w > 3 * h:
+        # Long block: cut along a into two halves.
+        if w2 % 2 and w > 2:
+            ax2, ay2 = ax2 + dax, ay2 + day
+        return [
+            (0, 0, ax2, ay2, bx, by),
+            (ax2, ay2, ax - ax2, ay - ay2, bx, by),
+        ]
+
+    # Standard case: one step up, one long horizontal step, one step down.
+    if h2 % 2 and h > 2:
+        bx2, by2 = bx2 + dbx, by2 + dby
+    return [
+        (0, 0, bx2, by2, ax2, ay2),
+        (bx2, by2, ax, ay, bx - bx2, by - by2),
+        ((ax - dax) + (bx2 - dbx), (ay - day) + (by2 - dby), -bx2, -by2, -(ax - ax2), -(ay - ay2)),
+    ]
+
+
+def _line(length: int, dx: int, dy: int, start: int = 0) -> np.ndarray:
+    steps = np.arange(start, start + length, dtype=np.int32)
+    return np.stack([steps * dx, steps * dy], axis=1)
+
+
+def _block(ax: int, ay: int, bx: int, by: int, memo: dict) -> np.ndarray:
+    """
+    Traversal of the block spanned by (a, b) as (k, 2) int32 offsets from its first pixel.
+    """
+    key = (ax, ay, bx, by)
+    cached = memo.get(key)
+    if cached is not None:
+        return cached
+
+    w, h = abs(ax + ay), abs(bx + by)
+    if h == 1:
+        block = _line(w, _sgn(ax), _sgn(ay))
+    elif w == 1:
+        block = _line(h, _sgn(bx), _sgn(by))
+    else:
+        block = np.concatenate([
+            _block(cax, cay, cbx, cby, memo) + np.array([ox, oy], dtype=np.int32)
+            for ox, oy, cax, cay, cbx, cby in _split(ax, ay, bx, by)
+        ])
+    memo[key] = block
+    return block
+
+
+def _iter_blocks(x: int, y: int, ax: int, ay: int, bx: int, by: int,
+                 chunk: int, memo: dict) -> Iterator[np.ndarray]:
+    w, h = abs(ax + ay), abs(bx + by)
+    if w * h <= chunk:
+        yield _block(ax, ay, bx, by, memo) + np.array([x, y], dtype=np.int32)
+    elif h == 1 or w == 1:
+        length, dx, dy = (w, _sgn(ax), _sgn(ay)) if h == 1 else (h, _sgn(bx), _sgn(by))
+        for start in range(0, length, chunk):
+            yield _line(min(chunk, length - start), dx, dy, start) + np.array([x, y], dtype=np.int32)
+    else:
+        for ox, oy, cax, cay, cbx, cby in _split(ax, ay, bx, by):
+            yield from _iter_blocks(x + ox, y + oy, cax, cay, cbx, cby, chunk, memo)
+
+
+# ----------------------------
+# Traversal generators
+# ----------------------------
+def iter_gilbert_order(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> Iterator[np.ndarray]:
+    """
+    Yield the generalized Hilbert traversal of a width x height image as int32 arrays of (x, y)
+    holding at most `chunk` pixels each. Work and memory are proportional to width * height.
+    """
+    if width <= 0 or height <= 0:
+        return
+    memo: dict = {}
+    if width >= height:
+        yield from _iter_blocks(0, 0, width, 0, 0, height, chunk, memo)
+    else:
+        yield from _iter_blocks(0, 0, 0, height, width, 0, chunk, memo)
+
+
+def gilbert_order(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+    """
+    Pixel coordinates of a width x height image along the generalized Hilbert curve,
+    as a (width * height, 2) int32 array of (x, y), without padding to a power-of-two square.
+    """
+    parts = list(iter_gilbert_order(width, height, chunk))
+    if not parts:
+        return np.empty((0, 2), dtype=np.int32)
+    return np.concatenate(parts)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+
+
+# ----------------------------
+# State-machine lookup tables
+# ----------------------------
+# A 2D Hilbert curve is a 4-state automaton: each state is one orientation of
+# the basic "U" pattern, and each base-4 digit of the curve index selects a
+# quadrant plus the orientation of the sub-curve inside it.
+# Row `state * 4 + digit` -> (quadrant x bit, quadrant y bit, next state).
+# The tables reproduce `hilbertcurve.HilbertCurve(order, 2)` exactly.
+_DECODE_X = np.array([0, 0, 1, 1, 0, 1, 1, 0, 1, 0, 0, 1, 1, 1, 0, 0], dtype=np.uint8)
+_DECODE_Y = np.array([0, 1, 1, 0, 0, 0, 1, 1, 1, 1, 0, 0, 1, 0, 0, 1], dtype=np.uint8)
+_DECODE_NEXT = np.array([1, 0, 0, 2, 0, 1, 1, 3, 3, 2, 2, 0, 2, 3, 3, 1], dtype=np.uint8)
+
+# Inverse tables, row `state * 4 + (qx << 1 | qy)` -> (digit, next state).
+_ENCODE_DIGIT = np.zeros(16, dtype=np.uint8)
+_ENCODE_NEXT = np.zeros(16, dtype=np.uint8)
+for _row in range(16):
+    _state, _digit = divmod(_row, 4)
+    _quad = _state * 4 + (int(_DECODE_X[_row]) << 1 | int(_DECODE_Y[_row]))
+    _ENCODE_DIGIT[_quad] = _digit
+    _ENCODE_NEXT[_quad] = _DECODE_NEXT[_row]
+del _row, _state, _digit, _quad
+
+DEFAULT_CHUNK = 1 << 20
+
+
+def hilbert_order_for(width: int, height: int) -> int:
+    """
+    Smallest order p such that the 2^p x 2^p Hilbert square covers width x height.
+    """
+    n = max(width, height)
+    order = 0
+    while (1 << order) < n:
+        order += 1
+    return order
+
+
+# ----------------------------
+# Batch encode / decode
+# ----------------------------
+def hilbert_decode(d: np.ndarray, order: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Map Hilbert indices to (x, y) coordinates on the 2^order square, on whole arrays.
+    """
+    d = np.asarray(d, dtype=np.uint64)
+    x = np.zeros(d.shape, dtype=np.uint32)
+    y = np.zeros(d.shape, dtype=np.uint32)
+    state = np.zeros(d.shape, dtype=np.uint8)
+    for level in range(order - 1, -1, -1):
+        row = state * np.uint8(4) + ((d >> np.uint64(2 * level)) & np.uint64(3)).astype(np.uint8)
+        x |= _DECODE_X[row].astype(np.uint32) << np.uint32(level)
+        y |= _DECODE_Y[row].astype(np.uint32) << np.uint32(level)
+        state = _DECODE_NEXT[row]
+    return x, y
+
+
+def hilbert_encode(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    """
+    Map (x, y) coordinates on the 2^order square to Hilbert indices, on whole arrays.
+    """
+    x = np.asarray(x, dtype=np.uint32)
+    y = np.asarray(y, dtype=np.uint32)
+    x, y = np.broadcast_arrays(x, y)
+    d = np.zeros(x.shape, dtype=np.uint64)
+    state = np.zeros(x.shape, dtype=np.uint8)
+    for level in range(order - 1, -1, -1):
+        qx = ((x >> np.uint32(level)) & np.uint32(1)).astype(np.uint8)
+        qy = ((y >> np.uint32(level)) & np.uint32(1)).astype(np.uint8)
+        row = state * np.uint8(4) + (qx << np.uint8(1) | qy)
+        d |= _ENCODE_DIGIT[row].astype(np.uint64) << np.uint64(2 * level)
+        state = _ENCODE_NEXT[row]
+    return d
+
+
+# ----------------------------
+# Traversal generators
+# ----------------------------
+def iter_hilbert_order(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> Iterator[np.ndarray]:
+    """
+    Yield the Hilbert traversal of a width x height image as (k, 2) int32 arrays of (x, y),
+    in curve order, decoding at most `chunk` curve indices at a time.
+    """
+    order = hilbert_order_for(width, height)
+    total = 1 << (2 * order)
+    for start in range(0, total, chunk):
+        d = np.arange(start, min(start + chunk, total), dtype=np.uint64)
+        x, y = hilbert_decode(d, order)
+        inside = (x < width) & (y < height)
+        if inside.any():
+            yield np.stack([x[inside], y[inside]], axis=1).astype(np.int32)
+
+
+def hilbert_order(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+    """
+    Pixel coordinates of a width x height image ordered along the 2D Hilbert curve,
+    as an (width * height, 2) int32 array of (x, y). Same order as sorting
+    `HilbertCurve.distance_from_point`, without the per-pixel calls or the sort.
+    """
+    parts = list(iter_hilbert_order(width, height, chunk))
+    if not parts:
+        return np.empty((0, 2), dtype=np.int32)
+    return np.concatenate(parts)
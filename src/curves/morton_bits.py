@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+
+
+# ----------------------------
+# Bit spreading ("magic numbers")
+# ----------------------------
+# Spreading the bits of a coordinate `dims` apart is done with a fixed series
+# of shift-or-mask steps, applied to whole arrays at once. The 64-bit masks are
+# truncated for uint32 codes, and steps whose shift is at least the word width
+# are dropped. Conventions follow pymorton: x lands on the lowest bit.
+_SPREAD_STEPS = {
+    2: ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF), (4, 0x0F0F0F0F0F0F0F0F),
+        (2, 0x3333333333333333), (1, 0x5555555555555555)),
+    3: ((32, 0x001F00000000FFFF), (16, 0x001F0000FF0000FF), (8, 0x100F00F00F00F00F),
+        (4, 0x10C30C30C30C30C3), (2, 0x1249249249249249)),
+}
+
+DEFAULT_CHUNK = 1 << 20
+_LEAF = 1 << 12
+
+
+def coord_bits(dims: int, dtype: type = np.uint64) -> int:
+    """
+    Number of bits per coordinate that fit in a `dims`-dimensional Morton code of `dtype`.
+    """
+    return np.iinfo(dtype).bits // dims
+
+
+def _steps(dims: int, dtype: type) -> list[tuple[np.ndarray, np.ndarray]]:
+    width = np.iinfo(dtype).bits
+    return [(dtype(shift), dtype(mask & ((1 << width) - 1)))
+            for shift, mask in _SPREAD_STEPS[dims] if shift < width]
+
+
+def _spread(v: np.ndarray, dims: int, dtype: type) -> np.ndarray:
+    v = np.asarray(v).astype(dtype) & dtype((1 << coord_bits(dims, dtype)) - 1)
+    for shift, mask in _steps(dims, dtype):
+        v = (v | (v << shift)) & mask
+    return v
+
+
+def _compact(code: np.ndarray, dims: int, dtype: type) -> np.ndarray:
+    steps = _steps(dims, dtype)
+    v = code & steps[-1][1]
+    masks = [mask for _, mask in steps[:-1]][::-1] + [dtype((1 << coord_bits(dims, dtype)) - 1)]
+    for (shift, _), mask in zip(steps[::-1], masks):
+        v = (v | (v >> shift)) & mask
+    return v
+
+
+# ----------------------------
+# Batch encode / decode
+# ----------------------------
+def interleave2(x: np.ndarray, y: np.ndarray, dtype: type = np.uint64) -> np.ndarray:
+    """
+    2D Morton codes of coordinate arrays (16 bits per axis for uint32, 32 for uint64).
+    """
+    return _spread(x, 2, dtype) | (_spread(y, 2, dtype) << dtype(1))
+
+
+def deinterleave2(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Inverse of `interleave2`; coordinates keep the dtype of `codes`.
+    """
+    codes = np.asarray(codes)
+    dtype = codes.dtype.type if codes.dtype in (np.uint32, np.uint64) else np.uint64
+    codes = codes.astype(dtype, copy=False)
+    return _compact(codes, 2, dtype), _compact(codes >> dtype(1), 2, dtype)
+
+
+def interleave3(x: np.ndarray, y: np.ndarray, z: np.ndarray, dtype: type = np.uint64) -> np.ndarray:
+    """
+    3D Morton codes of coordinate arrays (10 bits per axis for uint32, 21 for uint64).
+    """
+    return _spread(x, 3, dtype) | (_spread(y, 3, dtype) << dtype(1)) | (_spread(z, 3, dtype) << dtype(2))
+
+
+def deinterleave3(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Inverse of `interleave3`; coordinates keep the dtype of `codes`.
+    """
+    codes = np.asarray(codes)
+    dtype = codes.dtype.type if codes.dtype in (np.uint32, np.uint64) else np.uint64
+    codes = codes.astype(dtype, copy=False)
+    return (_compact(codes, 3, dtype), _compact(codes >> dtype(1), 3, dtype),
+            _compact(codes >> dtype(2), 3, dtype))
+
+
+# ----------------------------
+# Traversal generators
+# ----------------------------
+def _iter_blocks(bx: int, by: int, k: int, width: int, height: int,
+                 template: np.ndarray, chunk: int) -> Iterator[np.ndarray]:
+    side = 1 << k
+    if bx >= width or by >= height:
+        return
+    area = side * side
+    inside = bx + side <= width and by + side <= height
+    if area <= chunk and (inside or area <= _LEAF):
+        block = template[:area] + np.array([bx, by], dtype=np.int32)
+        if not inside:
+            block = block[(block[:, 0] < width) & (block[:, 1] < height)]
+        yield block
+        return
+    half = side >> 1
+    # Quadrants in Morton order: x is the low bit of each base-4 digit.
+    for qy in (0, 1):
+        for qx in (0, 1):
+            yield from _iter_blocks(bx + qx * half, by + qy * half, k - 1, width, height, template, chunk)
+
+
+def iter_morton_order(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> Iterator[np.ndarray]:
+    """
+    Yield the Morton (Z-order) traversal of a width x height image as int32 arrays of (x, y).
+
+    Aligned quadtree blocks fully inside the image are emitted by shifting one decoded
+    template, blocks fully outside are skipped, and only small blocks on the right and
+    bottom edges are masked, so no code is sorted and almost none is wasted.
+    """
+    if width <= 0 or height <= 0:
+        return
+    k = 0
+    while (1 << k) < max(width, height):
+        k += 1
+    leaf_k = 0
+    while 4 ** (leaf_k + 1) <= min(chunk, 4 ** k):
+        leaf_k += 1
+    x, y = deinterleave2(np.arange(4 ** leaf_k, dtype=np.uint64))
+    template = np.stack([x, y], axis=1).astype(np.int32)
+
+    # Edge blocks are small; gather them so callers still get chunk-sized arrays.
+    pending: list[np.ndarray] = []
+    size = 0
+    for block in _iter_blocks(0, 0, k, width, height, template, max(chunk, 1)):
+        pending.append(block)
+        size += len(block)
+        if size >= chunk:
+            yield np.concatenate(pending)
+            pending, size = [], 0
+    if pending:
+        yield np.concatenate(pending)
+
+
+def morton_order(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+    """
+    Pixel coordinates of a width x height image in Morton order, as a (width * height, 2)
+    int32 array of (x, y). Same order as sorting `pymorton.interleave2(x, y)`.
+    """
+    parts = list(iter_morton_order(width, height, chunk))
+    if not parts:
+        return np.empty((0, 2), dtype=np.int32)
+    return np.concatenate(parts)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+from src.curves.registry import curve_names, curve_version, source_digest
+
+
+# ----------------------------
+# On-disk store of traversal orders
+# ----------------------------
+# A traversal depends on (curve, width, height) and on the code that builds it,
+# so it is built once and kept as a `.npy` file next to a small `.json` sidecar.
+# Readers open the array with `np.load(mmap_mode="r")`: repeated runs and worker
+# processes share the same page-cached copy instead of rebuilding it.
+#
+# Entries are keyed by the builder's identity (module, qualified name and a
+# digest of its source file) and, for registered curve names, by the digest of
+# the curve's implementation (`curve_version`). Two builders stored under one
+# name never share an entry, and editing a curve's module rebuilds its paths.
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 2 << 30
+DEFAULT_DIR = Path.home() / ".cache" / "tipe-sfc" / "paths"
+
+PathBuilder = Callable[[int, int], "np.ndarray | list[tuple[int, int]]"]
+
+
+def builder_key(curve: str, build: PathBuilder, version: str = "1") -> str:
+    """
+    Digest identifying the code behind `build(width, height)` for `curve`, plus the caller's `version`.
+    """
+    target = getattr(build, "__func__", build)
+    parts = [version, getattr(target, "__module__", "") or "",
+             getattr(target, "__qualname__", type(build).__qualname__), source_digest(target)]
+    if curve in curve_names():
+        parts.append(curve_version(curve))
+    return hashlib.blake2b("\0".join(parts).encode(), digest_size=8).hexdigest()
+
+
+def _checksum(array: np.ndarray) -> str:
+    return hashlib.blake2b(np.ascontiguousarray(array).view(np.uint8), digest_size=16).hexdigest()
+
+
+class PathCache:
+    """
+    Directory of memory-mapped traversal orders with a size cap and LRU eviction.
+
+    Each entry records the cache format, the builder key and a checksum of
+    the coordinates; an entry whose metadata does not match is treated as stale
+    and rebuilt. Recency is tracked through the file modification time, which
+    every hit refreshes, so eviction stays correct across processes.
+    """
+
+    def __init__(self, directory: str | Path | None = None, max_bytes: int | None = None) -> None:
+        if directory is None:
+            directory = os.environ.get("SFC_PATH_CACHE_DIR", DEFAULT_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("SFC_PATH_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    def entry_path(self, curve: str, width: int, height: int, key: str = "") -> Path:
+        suffix = f"-{key}" if key else ""
+        return self.directory / f"{curve}-{width}x{height}{suffix}.npy"
+
+    def get(self, curve: str, width: int, height: int, build: PathBuilder,
+            version: str = "1", verify: bool = False) -> np.ndarray:
+        """
+        Return the (width * height, 2) int32 traversal for `curve`, memory-mapped read-only.
+        `build(width, height)` is only called on a miss or a stale entry; the entry is keyed
+        by `builder_key(curve, build, version)`. With `verify=True` the stored checksum is
+        recomputed before the entry is trusted.
+        """
+        version = builder_key(curve, build, version)
+        npy = self.entry_path(curve, width, height, version)
+        cached = self._load(npy, version, verify)
+        if cached is not None:
+            try:
+                os.utime(npy)
+            except OSError:
+                pass
+            return cached
+
+        path = np.ascontiguousarray(np.asarray(build(width, height), dtype=np.int32).reshape(-1, 2))
+        if path.size == 0:
+            return path
+        try:
+            self._store(npy, path, version)
+        except OSError:
+            # Read-only or full cache directory: fall back to the in-memory path.
+            return path
+        self.evict(keep=npy)
+        return np.load(npy, mmap_mode="r")
+
+    def _load(self, npy: Path, version: str, verify: bool) -> np.ndarray | None:
+        meta_file = npy.with_suffix(".json")
+        try:
+            meta = json.loads(meta_file.read_text())
+            path = np.load(npy, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if (meta.get("format") != CACHE_FORMAT or meta.get("version") != version
+                or meta.get("shape") != list(path.shape) or path.dtype != np.int32):
+            return None
+        if verify and _checksum(path) != meta.get("checksum"):
+            return None
+        return path
+
+    def _store(self, npy: Path, path: np.ndarray, version: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "format": CACHE_FORMAT,
+            "version": version,
+            "shape": list(path.shape),
+            "checksum": _checksum(path),
+        }
+        # The array goes first and the sidecar last, each written to a temporary
+        # and renamed, so concurrent workers never trust a half-written entry.
+        self._atomic_write(npy, lambda f: np.save(f, path))
+        self._atomic_write(npy.with_suffix(".json"), lambda f: f.write(json.dumps(meta).encode()))
+
+    def _atomic_write(self, target: Path, write: Callable) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp, target)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def evict(self, keep: Path | None = None) -> int:
+        """
+        Delete least recently used entries until the store fits in `max_bytes`.
+        Returns the number of bytes freed.
+        """
+        entries = []
+        for npy in self.directory.glob("*.npy"):
+            try:
+                stat = npy.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, npy))
+        total = sum(size for _, size, _ in entries)
+        freed = 0
+        for _, size, npy in sorted(entries, key=lambda e: e[0]):
+            if total - freed <= self.max_bytes:
+                break
+            if npy == keep:
+                continue
+            npy.unlink(missing_ok=True)
+            npy.with_suffix(".json").unlink(missing_ok=True)
+            freed += size
+        return freed
+
+    def clear(self) -> None:
+        for target in list(self.directory.glob("*.npy")) + list(self.directory.glob("*.json")):
+            target.unlink(missing_ok=True)
+
+
+_default_cache: PathCache | None = None
+
+
+def default_cache() -> PathCache:
+    """
+    Process-wide cache configured from SFC_PATH_CACHE_DIR / SFC_PATH_CACHE_MAX_BYTES.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PathCache()
+    return _default_cache
+
+
+def cached_path(curve: str, width: int, height: int, build: PathBuilder, version: str = "1") -> np.ndarray:
+    """
+    Shortcut for `default_cache().get(...)`.
+    """
+    return default_cache().get(curve, width, height, build, version)
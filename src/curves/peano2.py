@@ -1,52 +1,22 @@
+from __future__ import annotations
+
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.ticker import MultipleLocator
-from functools import lru_cache
 
-@lru_cache(maxsize=None)
+from src.curves.registry import get_curve
+
 def get_peano_coords(level: int) -> np.ndarray:
     """
-    Recursively generates the coordinates for the Peano curve of a given level.
-    Uses memoization to cache results for efficiency.
+    Generates the coordinates for the Peano curve of a given level, in curve order.
+    Uses the closed-form digit-by-digit decoder, so no level is kept in memory.
     """
-    if level == 1:
-        # Base case: The 9 points for the 3x3 grid in the first iteration.
-        return np.array([
-            (0, 0), (0, 1), (0, 2),
-            (1, 2), (1, 1), (1, 0),
-            (2, 0), (2, 1), (2, 2)
-        ])
-
-    # Recursive step: Generate the curve from the previous level.
-    prev_coords = get_peano_coords(level - 1)
-    side = 3**(level - 1)
-    
-    # The main path follows the pattern of the first-level curve.
-    main_path_template = get_peano_coords(1)
-    
-    all_coords = []
-    for i, (mx, my) in enumerate(main_path_template):
-        # Create a copy of the previous level's coordinates for transformation.
-        sub_coords = np.copy(prev_coords)
-
-        # Transformation Rule 1: Flip vertically for the middle column.
-        if i in {3, 4, 5}:
-            sub_coords[:, 1] = (side - 1) - sub_coords[:, 1]
-            
-        # Transformation Rule 2: Reverse path for every second segment to connect ends.
-        if i % 2 == 1:
-            sub_coords = sub_coords[::-1]
-
-        # Translate the transformed sub-curve to its correct position in the main grid.
-        offset = np.array([mx * side, my * side])
-        all_coords.append(sub_coords + offset)
-        
-    return np.vstack(all_coords)
+    return get_curve("peano").decode(np.arange(9 ** level), 3 ** level)
 
 def draw_peano(ax: plt.Axes, level: int):
     """
     Draws the Peano curve and its grid for a specific level on a given matplotlib axis.
     """
+    from matplotlib.ticker import MultipleLocator
+
     coords = get_peano_coords(level)
     # Scale coordinates to be in the center of the grid cells.
     scaled_coords = coords + 0.5
@@ -103,6 +73,8 @@ def main():
     """
     Main function to create and display the plot with the three iterations.
     """
+    import matplotlib.pyplot as plt
+
     fig, axes = plt.subplots(1, 3, figsize=(18, 6.5))
     fig.suptitle('Peano Curve Iterations in Python', fontsize=20)
     
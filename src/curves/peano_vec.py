@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+
+
+# ----------------------------
+# Closed-form Peano curve
+# ----------------------------
+# The 3x3 base pattern runs up the first column, down the second and up the
+# third. A sub-block is mirrored horizontally when its row is odd and
+# vertically when its column is odd; mirroring keeps the parity of a digit, so
+# the orientation of a block is one of four (flip x, flip y) states and each
+# base-9 digit of the index updates it by XOR. This gives a 4-state table
+# applied digit by digit on whole arrays, and a curve with unit steps only.
+#
+# Row `state * 9 + digit` -> (column, row, next state), state = flip_x << 1 | flip_y.
+_BASE = [(t // 3, t % 3 if (t // 3) % 2 == 0 else 2 - t % 3) for t in range(9)]
+_DECODE_X = np.zeros(36, dtype=np.uint8)
+_DECODE_Y = np.zeros(36, dtype=np.uint8)
+_DECODE_NEXT = np.zeros(36, dtype=np.uint8)
+_ENCODE_DIGIT = np.zeros(36, dtype=np.uint8)
+_ENCODE_NEXT = np.zeros(36, dtype=np.uint8)
+for _state in range(4):
+    _fx, _fy = _state >> 1, _state & 1
+    for _t, (_mx, _my) in enumerate(_BASE):
+        _qx = 2 - _mx if _fx else _mx
+        _qy = 2 - _my if _fy else _my
+        _next = ((_fx ^ (_my % 2)) << 1) | (_fy ^ (_mx % 2))
+        _row = _state * 9 + _t
+        _DECODE_X[_row], _DECODE_Y[_row], _DECODE_NEXT[_row] = _qx, _qy, _next
+        _ENCODE_DIGIT[_state * 9 + _qx * 3 + _qy] = _t
+        _ENCODE_NEXT[_state * 9 + _qx * 3 + _qy] = _next
+del _state, _fx, _fy, _t, _mx, _my, _qx, _qy, _next, _row
+
+DEFAULT_CHUNK = 1 << 20
+_LEAF = 3 ** 8
+
+
+def peano_level_for(width: int, height: int) -> int:
+    """
+    Smallest level k such that the 3^k x 3^k Peano square covers width x height.
+    """
+    n = max(width, height)
+    level, side = 0, 1
+    while side < n:
+        side *= 3
+        level += 1
+    return level
+
+
+# ----------------------------
+# Batch encode / decode
+# ----------------------------
+def peano_decode(d: np.ndarray, level: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Map Peano indices to (x, y) on the 3^level square, on whole arrays.
+    """
+    d = np.asarray(d, dtype=np.int64)
+    x = np.zeros(d.shape, dtype=np.int64)
+    y = np.zeros(d.shape, dtype=np.int64)
+    state = np.zeros(d.shape, dtype=np.uint8)
+    for l in range(level - 1, -1, -1):
+        row = state * np.uint8(9) + ((d // 9 ** l) % 9).astype(np.uint8)
+        x = x * 3 + _DECODE_X[row]
+        y = y * 3 + _DECODE_Y[row]
+        state = _DECODE_NEXT[row]
+    return x, y
+
+
+def peano_encode(x: np.ndarray, y: np.ndarray, level: int) -> np.ndarray:
+    """
+    Map (x, y) on the 3^level square to Peano indices, on whole arrays.
+    """
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=np.int64), np.asarray(y, dtype=np.int64))
+    d = np.zeros(x.shape, dtype=np.int64)
+    state = np.zeros(x.shape, dtype=np.uint8)
+    for l in range(level - 1, -1, -1):
+        scale = 3 ** l
+        row = state * np.uint8(9) + ((x // scale) % 3 * 3 + (y // scale) % 3).astype(np.uint8)
+        d = d * 9 + _ENCODE_DIGIT[row]
+        state = _ENCODE_NEXT[row]
+    return d
+
+
+# ----------------------------
+# Traversal generators
+# ----------------------------
+def _templates(level: int) -> list[np.ndarray]:
+    """
+    Traversal of a 3^level block in each of the four orientation states, as (k, 2) int32.
+    """
+    x, y = peano_decode(np.arange(9 ** level), level)
+    side = 3 ** level - 1
+    return [np.stack([side - x if fx else x, side - y if fy else y], axis=1).astype(np.int32)
+            for fx in (0, 1) for fy in (0, 1)]
+
+
+def _iter_blocks(bx: int, by: int, level: int, state: int, width: int, height: int,
+                 leaf: int, templates: list[list[np.ndarray]]) -> Iterator[np.ndarray]:
+    side = 3 ** level
+    if bx >= width or by >= height:
+        return
+    inside = bx + side <= width and by + side <= height
+    if level <= leaf and (inside or side * side <= _LEAF):
+        block = templates[level][state] + np.array([bx, by], dtype=np.int32)
+        if not inside:
+            block = block[(block[:, 0] < width) & (block[:, 1] < height)]
+        yield block
+        return
+    third = side // 3
+    for t in range(9):
+        row = state * 9 + t
+        yield from _iter_blocks(bx + int(_DECODE_X[row]) * third, by + int(_DECODE_Y[row]) * third,
+                                level - 1, int(_DECODE_NEXT[row]), width, height, leaf, templates)
+
+
+def iter_peano_order(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> Iterator[np.ndarray]:
+    """
+    Yield the Peano traversal of a width x height image (cropped from the covering
+    3^k square) as int32 arrays of (x, y), in curve order. Blocks outside the image
+    are skipped and only edge blocks are masked.
+    """
+    if width <= 0 or height <= 0:
+        return
+    level = peano_level_for(width, height)
+    leaf = 0
+    while leaf < level and 9 ** (leaf + 1) <= chunk:
+        leaf += 1
+    templates = [_templates(j) for j in range(leaf + 1)]
+
+    pending: list[np.ndarray] = []
+    size = 0
+    for block in _iter_blocks(0, 0, level, 0, width, height, leaf, templates):
+        pending.append(block)
+        size += len(block)
+        if size >= chunk:
+            yield np.concatenate(pending)
+            pending, size = [], 0
+    if pending:
+        yield np.concatenate(pending)
+
+
+def peano_order(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+    """
+    Pixel coordinates of a width x height image along the Peano curve of the covering
+    3^k square, as a (width * height, 2) int32 array of (x, y).
+    """
+    parts = list(iter_peano_order(width, height, chunk))
+    if not parts:
+        return np.empty((0, 2), dtype=np.int32)
+    return np.concatenate(parts)
@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import numpy as np
+
+from src.curves.curves3d import (hilbert3d_decode, hilbert3d_encode, iter_volume_order, morton3d_decode,
+                                 morton3d_encode, order3d_for)
+from src.curves.gilbert import iter_gilbert_order
+from src.curves.hilbert_lut import hilbert_decode, hilbert_encode, hilbert_order_for, iter_hilbert_order
+from src.curves.morton_bits import deinterleave2, interleave2, iter_morton_order
+from src.curves.peano_vec import iter_peano_order, peano_decode, peano_encode, peano_level_for
+
+DEFAULT_CHUNK = 1 << 20
+
+
+# ----------------------------
+# Curve registry
+# ----------------------------
+# Every traversal is exposed through the same batch interface, and consumers
+# (dithering, metrics, containers, benchmarks, colour sorting) select curves
+# by name. Replacing the implementation of a curve here replaces it everywhere.
+#
+# Indices are taken on the curve's own grid:
+#   "any"  - the grid is exactly `shape`; indices of its points are 0..size-1
+#            (raster, serpentine, gilbert).
+#   "pow2" / "pow3" - the curve fills the smallest 2^k / 3^k cube covering
+#            `shape`; indices are positions on that cube, and `order` lists
+#            the points inside `shape` (hilbert, morton, peano, 3D curves).
+# Points are (N, dims) arrays of (x, y[, z]).
+@dataclass(frozen=True)
+class Curve:
+    """
+    One registered traversal: `encode`, `decode` and `order` / `iter_order`, plus
+    its capabilities (`dims`, `grid`, and `unit_steps` when consecutive points of the
+    whole curve grid are neighbours; a traversal cropped from a larger cube can jump).
+    """
+
+    name: str
+    dims: int
+    grid: str
+    unit_steps: bool
+    iter_fn: Callable[..., Iterator[np.ndarray]]
+    encode_fn: Callable[[np.ndarray, tuple[int, ...]], np.ndarray]
+    decode_fn: Callable[[np.ndarray, tuple[int, ...]], np.ndarray]
+    description: str = ""
+
+    def _shape(self, shape: tuple[int, ...] | int) -> tuple[int, ...]:
+        shape = (shape,) * self.dims if isinstance(shape, (int, np.integer)) else tuple(int(s) for s in shape)
+        if len(shape) != self.dims or min(shape) <= 0:
+            raise ValueError(f"{self.name}: expected a positive {self.dims}D shape, got {shape}")
+        return shape
+
+    def encode(self, points: np.ndarray, shape: tuple[int, ...] | int | None = None) -> np.ndarray:
+        """
+        Curve indices of an (N, dims) array of points on the grid `shape` (default: the
+        bounding box of the points, from the origin).
+        """
+        points = np.asarray(points, dtype=np.int64).reshape(-1, self.dims)
+        if shape is None:
+            shape = tuple((points.max(axis=0) + 1).tolist()) if len(points) else (1,) * self.dims
+        shape = self._shape(shape)
+        if len(points) and ((points < 0).any() or (points >= np.array(shape)).any()):
+            raise ValueError(f"{self.name}: points outside the {shape} grid")
+        return self.encode_fn(points, shape)
+
+    def decode(self, indices: np.ndarray, shape: tuple[int, ...] | int) -> np.ndarray:
+        """
+        (N, dims) int64 points at the given curve indices on the grid `shape`. On "pow2" and
+        "pow3" curves, indices past the points of `shape` decode to points of the covering cube.
+        """
+        shape = self._shape(shape)
+        indices = np.asarray(indices).reshape(-1)
+        if len(indices) and (indices.min() < 0 or int(indices.max()) >= self.capacity(shape)):
+            raise ValueError(f"{self.name}: indices outside the curve on the {shape} grid")
+        return self.decode_fn(indices, shape)
+
+    def capacity(self, shape: tuple[int, ...] | int) -> int:
+        """
+        Number of indices of the curve on the grid `shape` (its covering cube for "pow2"/"pow3").
+        """
+        shape = self._shape(shape)
+        if self.grid == "any":
+            return int(np.prod(shape))
+        side = 2 if self.grid == "pow2" else 3
+        return side ** (_level(side, max(shape)) * self.dims)
+
+    def iter_order(self, *shape: int, chunk: int = DEFAULT_CHUNK) -> Iterator[np.ndarray]:
+        """
+        Yield the traversal of the grid `shape` (width, height[, depth]) as int32 arrays of
+        points, in curve order, about `chunk` points at a time.
+        """
+        return self.iter_fn(*self._shape(shape), chunk=chunk)
+
+    def order(self, *shape: int, chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+        """
+        Every point of the grid `shape` in curve order, as a (size, dims) int32 array.
+        """
+        parts = list(self.iter_order(*shape, chunk=chunk))
+        if not parts:
+            return np.empty((0, self.dims), dtype=np.int32)
+        return np.concatenate(parts)
+
+
+_REGISTRY: dict[str, Curve] = {}
+
+
+def register_curve(curve: Curve, replace: bool = False) -> Curve:
+    """
+    Add `curve` to the registry; `replace=True` swaps in another implementation of an existing name.
+    """
+    if curve.grid not in ("any", "pow2", "pow3"):
+        raise ValueError(f"unknown grid constraint {curve.grid!r}")
+    if curve.name in _REGISTRY and not replace:
+        raise ValueError(f"curve {curve.name!r} is already registered")
+    _REGISTRY[curve.name] = curve
+    return curve
+
+
+def get_curve(name: str) -> Curve:
+    try:
+        return _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"unknown curve {name!r}, expected one of {', '.join(_REGISTRY)}") from None
+
+
+def curve_names(dims: int | None = None) -> list[str]:
+    """
+    Registered curve names, in registration order, optionally only those of `dims` dimensions.
+    """
+    return [name for name, curve in _REGISTRY.items() if dims is None or curve.dims == dims]
+
+
+def curve_order(name: str, width: int, height: int, chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+    """
+    `get_curve(name).order(width, height)`: the usual (width * height, 2) int32 path of a 2D curve.
+    """
+    return get_curve(name).order(width, height, chunk=chunk)
+
+
+_SOURCE_DIGESTS: dict[tuple[str, int, int], str] = {}
+
+
+def source_digest(fn: Callable) -> str:
+    """
+    Digest of the source file that defines `fn` (empty for builtins and callables without one),
+    cached while the file keeps its size and modification time.
+    """
+    try:
+        path = inspect.getsourcefile(inspect.unwrap(fn))
+    except TypeError:
+        return ""
+    if path is None:
+        return ""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ""
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _SOURCE_DIGESTS:
+        with open(path, "rb") as f:
+            _SOURCE_DIGESTS[key] = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    return _SOURCE_DIGESTS[key]
+
+
+def curve_version(name: str) -> str:
+    """
+    Digest of the sources that implement a registered curve: the modules of its traversal,
+    encoder and decoder, and this registry. It changes whenever the curve's code may have.
+    """
+    curve = get_curve(name)
+    parts = {source_digest(fn) for fn in (curve.iter_fn, curve.encode_fn, curve.decode_fn, get_curve)}
+    return hashlib.blake2b("".join(sorted(parts)).encode(), digest_size=16).hexdigest()
+
+
+# ----------------------------
+# Built-in curves
+# ----------------------------
+def _level(side: int, n: int) -> int:
+    level = 0
+    while side ** level < n:
+        level += 1
+    return level
+
+
+def _points(*axes: np.ndarray) -> np.ndarray:
+    return np.stack([np.asarray(a, dtype=np.int64) for a in axes], axis=1)
+
+
+def _iter_raster(width: int, height: int, chunk: int = DEFAULT_CHUNK, serpentine: bool = False
+                 ) -> Iterator[np.ndarray]:
+    rows = max(1, chunk // width)
+    for y0 in range(0, height, rows):
+        y, x = np.mgrid[y0:min(y0 + rows, height), 0:width].astype(np.int32)
+        if serpentine:
+            x[y % 2 == 1] = width - 1 - x[y % 2 == 1]
+        yield np.stack([x.ravel(), y.ravel()], axis=1)
+
+
+def _iter_serpentine(width: int, height: int, chunk: int = DEFAULT_CHUNK) -> Iterator[np.ndarray]:
+    return _iter_raster(width, height, chunk, serpentine=True)
+
+
+def _raster_encode(points: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return points[:, 1] * shape[0] + points[:, 0]
+
+
+def _raster_decode(indices: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    y, x = np.divmod(np.asarray(indices, dtype=np.int64), shape[0])
+    return _points(x, y)
+
+
+def _serpentine_encode(points: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    x, y = points[:, 0], points[:, 1]
+    return y * shape[0] + np.where(y % 2 == 1, shape[0] - 1 - x, x)
+
+
+def _serpentine_decode(indices: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    y, x = np.divmod(np.asarray(indices, dtype=np.int64), shape[0])
+    return _points(np.where(y % 2 == 1, shape[0] - 1 - x, x), y)
+
+
+# Gilbert has no closed form: encode and decode go through the traversal of the
+# exact rectangle, and its rank table. Both are kept in a small LRU per shape, so
+# repeated batches on one shape cost a lookup instead of a rebuild (int32, about
+# 12 bytes per pixel once both are built).
+GILBERT_CACHE_SIZE = 4
+_gilbert_cache: OrderedDict[tuple[int, int], list[np.ndarray | None]] = OrderedDict()
+
+
+def _gilbert_tables(shape: tuple[int, ...], rank: bool = False) -> list[np.ndarray | None]:
+    """
+    [order, rank] of the gilbert traversal of `shape`: the (N, 2) points and, if `rank`, the
+    index of each pixel (flat y * width + x). Cached per shape.
+    """
+    width, height = shape
+    key = (width, height)
+    tables = _gilbert_cache.get(key)
+    if tables is None:
+        order = get_curve("gilbert").order(width, height)
+        tables = [order, None]
+        _gilbert_cache[key] = tables
+        if len(_gilbert_cache) > GILBERT_CACHE_SIZE:
+            _gilbert_cache.popitem(last=False)
+    else:
+        _gilbert_cache.move_to_end(key)
+    if rank and tables[1] is None:
+        order = tables[0]
+        ranks = np.empty(width * height, dtype=np.int32 if width * height < 1 << 31 else np.int64)
+        ranks[order[:, 1].astype(np.int64) * width + order[:, 0]] = np.arange(width * height, dtype=ranks.dtype)
+        tables[1] = ranks
+    return tables
+
+
+def _gilbert_encode(points: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    width = shape[0]
+    rank = _gilbert_tables(shape, rank=True)[1]
+    return rank[points[:, 1].astype(np.int64) * width + points[:, 0]].astype(np.int64)
+
+
+def _gilbert_decode(indices: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return _gilbert_tables(shape)[0][np.asarray(indices, dtype=np.int64)].astype(np.int64)
+
+
+def _hilbert_encode(points: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return hilbert_encode(points[:, 0], points[:, 1], hilbert_order_for(*shape))
+
+
+def _hilbert_decode(indices: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return _points(*hilbert_decode(indices, hilbert_order_for(*shape)))
+
+
+def _morton_encode(points: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return interleave2(points[:, 0], points[:, 1])
+
+
+def _morton_decode(indices: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return _points(*deinterleave2(np.asarray(indices, dtype=np.uint64)))
+
+
+def _peano_encode(points: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return peano_encode(points[:, 0], points[:, 1], peano_level_for(*shape))
+
+
+def _peano_decode(indices: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return _points(*peano_decode(indices, peano_level_for(*shape)))
+
+
+def _hilbert3d_encode(points: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return hilbert3d_encode(points[:, 0], points[:, 1], points[:, 2], order3d_for(*shape))
+
+
+def _hilbert3d_decode(indices: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return _points(*hilbert3d_decode(indices, order3d_for(*shape)))
+
+
+def _morton3d_encode(points: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return morton3d_encode(points[:, 0], points[:, 1], points[:, 2])
+
+
+def _morton3d_decode(indices: np.ndarray, shape: tuple[int, ...]) -> np.ndarray:
+    return _points(*morton3d_decode(np.asarray(indices, dtype=np.uint64)))
+
+
+def _iter_volume(curve: str) -> Callable[..., Iterator[np.ndarray]]:
+    def iter_fn(width: int, height: int, depth: int, chunk: int = DEFAULT_CHUNK) -> Iterator[np.ndarray]:
+        return iter_volume_order(width, height, depth, curve, chunk)
+    return iter_fn
+
+
+register_curve(Curve("hilbert", 2, "pow2", True, iter_hilbert_order, _hilbert_encode, _hilbert_decode,
+                     "2D Hilbert curve, same indices as hilbertcurve.HilbertCurve(p, 2)"))
+register_curve(Curve("gilbert", 2, "any", False, iter_gilbert_order, _gilbert_encode, _gilbert_decode,
+                     "generalized Hilbert curve of any rectangle (one diagonal step on some odd sizes)"))
+register_curve(Curve("morton", 2, "pow2", False, iter_morton_order, _morton_encode, _morton_decode,
+                     "Z-order, same indices as pymorton.interleave2"))
+register_curve(Curve("peano", 2, "pow3", True, iter_peano_order, _peano_encode, _peano_decode,
+                     "Peano curve on 3^k squares"))
+register_curve(Curve("raster", 2, "any", False, _iter_raster, _raster_encode, _raster_decode,
+                     "left to right, top to bottom"))
+register_curve(Curve("serpentine", 2, "any", True, _iter_serpentine, _serpentine_encode, _serpentine_decode,
+                     "boustrophedon raster, odd rows right to left"))
+register_curve(Curve("hilbert3d", 3, "pow2", True, _iter_volume("hilbert"), _hilbert3d_encode, _hilbert3d_decode,
+                     "3D Hilbert curve, same indices as hilbertcurve.HilbertCurve(p, 3)"))
+register_curve(Curve("morton3d", 3, "pow2", False, _iter_volume("morton"), _morton3d_encode, _morton3d_decode,
+                     "3D Z-order, same indices as pymorton.interleave3"))
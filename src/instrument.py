@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# ----------------------------
+# Per-stage instrumentation
+# ----------------------------
+# Code marks its stages with `stage("name")` and its work with
+# `count("pixels", n)`. Both go to the current profiler, which is disabled by
+# default: a disabled `stage` is one attribute test and returns a shared no-op
+# context manager, so the hooks can stay in hot-ish code paths.
+#
+# An enabled profiler records, per stage, wall time and the peaks of traced
+# Python/NumPy allocations (tracemalloc) and of the process RSS. Nested stages
+# are allowed; a parent's allocation peak includes its children's.
+class _NullStage:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+
+_NULL_STAGE = _NullStage()
+
+
+def _rss_peak_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Profiler:
+    """
+    Collects stage events and counters. Export with `write_json` (aggregated profile
+    plus raw events) or `write_chrome_trace` (for chrome://tracing or Perfetto).
+
+    Event times are microseconds since `origin_ns` (a `time.time_ns()` value, default:
+    creation time); profilers of several processes given the same origin share a timeline.
+    """
+
+    def __init__(self, enabled: bool = False, memory: bool = True, origin_ns: int | None = None):
+        self.enabled = False
+        self.memory = memory
+        self.events: list[dict] = []
+        self.counters: dict[str, float] = {}
+        self.origin_ns = time.time_ns() if origin_ns is None else origin_ns
+        # perf_counter reading that corresponds to origin_ns.
+        self._origin = time.perf_counter_ns() - (time.time_ns() - self.origin_ns)
+        self._stack: list[dict] = []
+        self._started_tracemalloc = False
+        if enabled:
+            self.enable()
+
+    def enable(self) -> None:
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self) -> None:
+        self.events.clear()
+        self.counters.clear()
+        self._stack.clear()
+        self.origin_ns = time.time_ns()
+        self._origin = time.perf_counter_ns()
+
+    # ---- hooks ----
+    def stage(self, name: str, **args):
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._stage(name, args)
+
+    @contextmanager
+    def _stage(self, name: str, args: dict) -> Iterator[None]:
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            if self._stack:
+                parent = self._stack[-1]
+                parent["peak"] = max(parent["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        frame = {"peak": 0}
+        self._stack.append(frame)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            self._stack.pop()
+            event = {
+                "name": name,
+                "start_us": (start - self._origin) / 1e3,
+                "duration_us": (end - start) / 1e3,
+                "depth": len(self._stack),
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+                "rss_peak_bytes": _rss_peak_bytes(),
+            }
+            if tracing:
+                peak = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                event["tracemalloc_peak_bytes"] = peak
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            if args:
+                event["args"] = args
+            self.events.append(event)
+
+    def count(self, name: str, value: float = 1) -> None:
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    # ---- export ----
+    def profile(self) -> dict:
+        """
+        Aggregated view: calls, total and max seconds and memory peaks per stage name,
+        plus counters and the raw events.
+        """
+        stages: dict[str, dict] = {}
+        for event in self.events:
+            s = stages.setdefault(event["name"], {"calls": 0, "total_s": 0.0, "max_s": 0.0,
+                                                  "tracemalloc_peak_bytes": 0, "rss_peak_bytes": 0})
+            seconds = event["duration_us"] / 1e6
+            s["calls"] += 1
+            s["total_s"] += seconds
+            s["max_s"] = max(s["max_s"], seconds)
+            s["tracemalloc_peak_bytes"] = max(s["tracemalloc_peak_bytes"], event.get("tracemalloc_peak_bytes") or 0)
+            s["rss_peak_bytes"] = max(s["rss_peak_bytes"], event.get("rss_peak_bytes") or 0)
+        return {"stages": stages, "counters": dict(self.counters), "events": list(self.events)}
+
+    def write_json(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.profile(), indent=1) + "\n", encoding="utf-8")
+
+    def write_chrome_trace(self, path: str | Path, events: list[dict] | None = None) -> None:
+        """
+        Chrome trace-event JSON: one complete ("X") event per stage and one counter ("C")
+        event per counter. `events` defaults to this profiler's; pass merged events (for
+        instance from several worker processes) to write them all in one trace.
+        """
+        events = self.events if events is None else events
+        trace = []
+        for event in events:
+            args = {k: event[k] for k in ("tracemalloc_peak_bytes", "rss_peak_bytes") if event.get(k) is not None}
+            args.update(event.get("args", {}))
+            trace.append({"name": event["name"], "ph": "X", "ts": event["start_us"], "dur": event["duration_us"],
+                          "pid": event["pid"], "tid": event["tid"], "args": args})
+        end = max((e["start_us"] + e["duration_us"] for e in events), default=0.0)
+        for name, value in self.counters.items():
+            trace.append({"name": name, "ph": "C", "ts": end, "pid": os.getpid(), "args": {name: value}})
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": trace, "displayTimeUnit": "ms"}) + "\n", encoding="utf-8")
+
+
+# ----------------------------
+# Process-wide profiler
+# ----------------------------
+_profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+    return _profiler
+
+
+def set_profiler(profiler: Profiler) -> Profiler:
+    """
+    Install `profiler` as the process-wide one and return the previous one.
+    """
+    global _profiler
+    previous, _profiler = _profiler, profiler
+    return previous
+
+
+def stage(name: str, **args):
+    """
+    `with stage("dither", curve="hilbert"): ...` on the process-wide profiler.
+    """
+    return _profiler.stage(name, **args)
+
+
+def count(name: str, value: float = 1) -> None:
+    _profiler.count(name, value)
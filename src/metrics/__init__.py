@@ -1,4 +1,3 @@
-python
 """
 Projet TIPE : Courbes Remplissant l'Espace (CRE) et Traitement d'Images
 """
@@ -6,3 +5,37 @@ Projet TIPE : Courbes Remplissant l'Espace (CRE) et Traitement d'Images
 __version__ = "1.0.0"
 __author__ = "Sami Ennedoui"
 __description__ = "Application des parcours fractals (Hilbert, Morton) au tramage et à la compression d'images."
+
+
+# Public functions, re-exported lazily (PEP 562): importing the package loads
+# nothing but this table, and `from src.metrics import traversal_entropy` imports only
+# the module that defines it. The experiment scripts next to these modules
+# are not part of the API and only run through their `main()`.
+_EXPORTS = {
+    "compressed_size": "compression_matrix",
+    "curve_ordered_bytes": "compression_matrix",
+    "format_table": "compression_matrix",
+    "quantize01": "entropy_engine",
+    "symbols_along": "entropy_engine",
+    "block_entropy": "entropy_engine",
+    "conditional_entropy": "entropy_engine",
+    "entropy_bits_per_symbol": "entropy_engine",
+    "traversal_entropy": "entropy_engine",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
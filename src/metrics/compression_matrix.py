@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Callable
+
+import numpy as np
+
+from src.curves.path_cache import cached_path
+
+
+# ----------------------------
+# Codecs
+# ----------------------------
+# Every codec works on bytes in memory. zlib, bz2 and lzma release the GIL while
+# compressing, so the cells of the matrix run concurrently in threads.
+CODECS: dict[str, Callable[[bytes, int], bytes]] = {
+    "zlib": lambda data, level: zlib.compress(data, level),
+    "gzip": lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+    "bz2": lambda data, level: bz2.compress(data, level),
+    "lzma": lambda data, level: lzma.compress(data, preset=level),
+}
+
+DECOMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "zlib": zlib.decompress,
+    "gzip": gzip.decompress,
+    "bz2": bz2.decompress,
+    "lzma": lzma.decompress,
+}
+
+DEFAULT_LEVELS: dict[str, tuple[int, ...]] = {
+    "zlib": (1, 6, 9),
+    "gzip": (9,),
+    "bz2": (1, 9),
+    "lzma": (0, 6),
+}
+
+LAYOUTS = ("planar", "interleaved")
+
+
+def compressed_size(data: bytes, codec: str = "gzip", level: int = 9) -> int:
+    """
+    Size in bytes of `data` compressed in memory with `codec` at `level`.
+    """
+    return len(CODECS[codec](data, level))
+
+
+# ----------------------------
+# Curve-ordered buffers
+# ----------------------------
+def as_u8(image: np.ndarray) -> np.ndarray:
+    """
+    uint8 view of an image: uint8 input is kept, floats in [0, 1] are scaled by 255.
+    """
+    image = np.asarray(image)
+    if image.dtype == np.uint8:
+        return image
+    return (np.clip(image, 0, 1) * 255).astype(np.uint8)
+
+
+def curve_ordered_bytes(image: np.ndarray, path: np.ndarray | list[tuple[int, int]],
+                        layout: str = "planar") -> bytes:
+    """
+    Serialize an (h, w) or (h, w, c) image in the order of `path` (a sequence of (x, y)).
+
+    - "planar": every channel is written along the whole path, one after the other.
+    - "interleaved": the channels of each pixel are written together.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"unknown layout {layout!r}, expected one of {LAYOUTS}")
+    image = as_u8(image)
+    coords = np.asarray(path, dtype=np.intp).reshape(-1, 2)
+    pixels = image[coords[:, 1], coords[:, 0]]
+    if pixels.ndim == 2 and layout == "planar":
+        pixels = pixels.T
+    return np.ascontiguousarray(pixels).tobytes()
+
+
+# ----------------------------
+# Matrix
+# ----------------------------
+@dataclass(frozen=True)
+class MatrixCell:
+    """
+    One (image, curve, layout, codec, level) measurement.
+    """
+
+    image: str
+    curve: str
+    layout: str
+    codec: str
+    level: int
+    raw_bytes: int
+    compressed_bytes: int
+    seconds: float
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.raw_bytes / 1e6 / self.seconds if self.seconds > 0 else float("inf")
+
+    def to_record(self) -> dict:
+        return {**asdict(self), "ratio": self.ratio, "mb_per_s": self.mb_per_s}
+
+
+def _run_cell(key: tuple[str, str, str], data: bytes, codec: str, level: int) -> MatrixCell:
+    start = time.perf_counter()
+    size = compressed_size(data, codec, level)
+    return MatrixCell(*key, codec, level, len(data), size, time.perf_counter() - start)
+
+
+def compression_matrix(images: dict[str, np.ndarray],
+                       curves: dict[str, Callable[[int, int], np.ndarray | list[tuple[int, int]]]],
+                       levels: dict[str, tuple[int, ...]] | None = None,
+                       layouts: tuple[str, ...] = LAYOUTS,
+                       workers: int | None = None) -> list[MatrixCell]:
+    """
+    Compress every image, ordered along every curve, with every codec and level.
+
+    `images` maps names to (h, w) or (h, w, c) arrays (uint8, or floats in [0, 1]);
+    `curves` maps curve names to path builders `(width, height) -> path`, fetched through
+    the path cache. Single-channel images have one layout only and are reported as
+    "planar". Cells run in a thread pool of `workers` threads; results come back in
+    (image, curve, layout, codec, level) order.
+    """
+    levels = DEFAULT_LEVELS if levels is None else levels
+    jobs = []
+    for image_name, image in images.items():
+        h, w = image.shape[:2]
+        image_layouts = layouts if image.ndim == 3 and image.shape[2] > 1 else ("planar",)
+        for curve_name, build in curves.items():
+            path = cached_path(curve_name, w, h, build)
+            for layout in image_layouts:
+                data = curve_ordered_bytes(image, path, layout)
+                for codec, codec_levels in levels.items():
+                    for level in codec_levels:
+                        jobs.append(((image_name, curve_name, layout), data, codec, level))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda job: _run_cell(*job), jobs))
+
+
+def format_table(cells: list[MatrixCell]) -> str:
+    """
+    Plain-text table of a compression matrix: sizes, ratios and throughput.
+    """
+    header = f"{'image':<14} {'curve':<9} {'layout':<11} {'codec':<6} {'lvl':>3} " \
+             f"{'raw':>10} {'compressed':>10} {'ratio':>7} {'MB/s':>8}"
+    lines = [header, "-" * len(header)]
+    for c in cells:
+        lines.append(f"{c.image:<14} {c.curve:<9} {c.layout:<11} {c.codec:<6} {c.level:>3} "
+                     f"{c.raw_bytes:>10} {c.compressed_bytes:>10} {c.ratio:>7.2f} {c.mb_per_s:>8.1f}")
+    return "\n".join(lines)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+# ----------------------------
+# Entropy of symbol sequences
+# ----------------------------
+# Pixels are read in traversal order and treated as a sequence of integer
+# symbols. Order-0 entropy is the same for every traversal of an image; block
+# (n-gram) and conditional entropies are not, and show how much of the
+# neighbourhood a curve keeps together. All counts come from one `np.bincount`
+# per call: rows of a batch are given disjoint ranges of bins. Dense tables are
+# capped at 4M bins (32 MiB of int64 counts); above that, e.g. 3-grams of 8-bit
+# pixels, only the n-grams that occur are counted, with `np.unique`.
+BINCOUNT_MAX_BINS = 1 << 22
+
+
+def quantize01(image01: np.ndarray, levels: int = 256) -> np.ndarray:
+    """
+    Symbols of an image in [0, 1]: the bin of a `levels`-bin histogram over [0, 1]
+    (same binning as `np.histogram(..., bins=levels, range=(0, 1))`).
+    """
+    return np.clip((np.asarray(image01, dtype=np.float64) * levels).astype(np.int64), 0, levels - 1)
+
+
+def symbols_along(images: np.ndarray, paths: list[np.ndarray | list[tuple[int, int]]]) -> np.ndarray:
+    """
+    Read (h, w) or (n, h, w) images of integer symbols along each path (sequences of (x, y)).
+    Returns an (n, len(paths), length) array; every path must have the same length.
+    """
+    images = np.asarray(images)
+    if images.ndim == 2:
+        images = images[None]
+    seqs = []
+    for path in paths:
+        coords = np.asarray(path, dtype=np.intp).reshape(-1, 2)
+        seqs.append(images[:, coords[:, 1], coords[:, 0]])
+    return np.stack(seqs, axis=1)
+
+
+def _entropy_of_counts(counts: np.ndarray) -> np.ndarray:
+    """
+    Shannon entropy in bits of each row of a (rows, bins) count array.
+    """
+    counts = counts.astype(np.float64)
+    totals = counts.sum(axis=1, keepdims=True)
+    p = np.divide(counts, totals, out=np.zeros_like(counts), where=totals > 0)
+    logs = np.log2(p, out=np.zeros_like(p), where=p > 0)
+    # + 0.0 turns the -0.0 of constant rows into 0.0.
+    return -(p * logs).sum(axis=1) + 0.0
+
+
+def _alphabet(seqs: np.ndarray, alphabet: int | None) -> int:
+    if alphabet is not None:
+        return alphabet
+    return int(seqs.max()) + 1 if seqs.size else 1
+
+
+def block_codes(seqs: np.ndarray, n: int, alphabet: int) -> np.ndarray:
+    """
+    Integer code of every overlapping n-gram along the last axis: shape (..., length - n + 1).
+    """
+    if alphabet ** n > 1 << 62:
+        raise ValueError(f"{n}-grams over {alphabet} symbols do not fit in 64-bit codes")
+    seqs = np.asarray(seqs, dtype=np.int64)
+    length = seqs.shape[-1] - n + 1
+    codes = np.zeros(seqs.shape[:-1] + (max(length, 0),), dtype=np.int64)
+    if length <= 0:
+        return codes
+    for j in range(n):
+        codes = codes * alphabet + seqs[..., j:j + length]
+    return codes
+
+
+def block_entropy(seqs: np.ndarray, n: int = 1, alphabet: int | None = None) -> np.ndarray:
+    """
+    Entropy H_n in bits of the overlapping n-grams of each sequence (last axis).
+    H_1 is the order-0 entropy. Returns an array of shape seqs.shape[:-1].
+    """
+    seqs = np.asarray(seqs)
+    if n == 0:
+        return np.zeros(seqs.shape[:-1])
+    alphabet = _alphabet(seqs, alphabet)
+    codes = block_codes(seqs, n, alphabet)
+    if codes.shape[-1] == 0:
+        # Sequences shorter than n have no n-grams.
+        return np.zeros(codes.shape[:-1])
+    rows = codes.reshape(int(np.prod(codes.shape[:-1])), codes.shape[-1])
+    bins = alphabet ** n
+    if bins * len(rows) <= BINCOUNT_MAX_BINS:
+        offsets = (np.arange(len(rows), dtype=np.int64) * bins)[:, None]
+        counts = np.bincount((rows + offsets).ravel(), minlength=bins * len(rows)).reshape(len(rows), bins)
+        result = _entropy_of_counts(counts)
+    elif bins <= BINCOUNT_MAX_BINS:
+        result = np.array([_entropy_of_counts(np.bincount(row, minlength=bins)[None])[0] for row in rows])
+    else:
+        # Too many possible n-grams for a dense table: count only those that occur.
+        result = np.array([_entropy_of_counts(np.unique(row, return_counts=True)[1][None])[0] for row in rows])
+    return result.reshape(codes.shape[:-1])
+
+
+def conditional_entropy(seqs: np.ndarray, k: int, alphabet: int | None = None) -> np.ndarray:
+    """
+    Order-k conditional entropy H(X_t | X_{t-k}, ..., X_{t-1}) = H_{k+1} - H_k, in bits/symbol.
+    """
+    alphabet = _alphabet(np.asarray(seqs), alphabet)
+    # Clipped at 0: H_{k+1} - H_k can come out as -1e-15 from rounding.
+    return np.maximum(block_entropy(seqs, k + 1, alphabet) - block_entropy(seqs, k, alphabet), 0.0)
+
+
+def entropy_bits_per_symbol(seqs: np.ndarray, alphabet: int | None = None) -> np.ndarray:
+    """
+    Order-0 entropy of each sequence (last axis), in bits/symbol.
+    """
+    return block_entropy(seqs, 1, alphabet)
+
+
+# ----------------------------
+# Traversal report
+# ----------------------------
+def traversal_entropy(images: np.ndarray, paths: list[np.ndarray | list[tuple[int, int]]],
+                      max_order: int = 2, alphabet: int | None = None) -> np.ndarray:
+    """
+    Conditional entropies of order 0..max_order of every image read along every path.
+
+    `images` is (h, w) or (n, h, w) of integer symbols (e.g. `quantize01(...)`, or 0/1
+    dithered pixels). Returns an (n, len(paths), max_order + 1) array in bits/pixel.
+    """
+    seqs = symbols_along(images, paths)
+    alphabet = _alphabet(seqs, alphabet)
+    blocks = [block_entropy(seqs, n, alphabet) for n in range(max_order + 2)]
+    return np.maximum(np.stack([blocks[k + 1] - blocks[k] for k in range(max_order + 1)], axis=-1), 0.0)
@@ -1,4 +1,3 @@
-python
 """
 Projet TIPE : Courbes Remplissant l'Espace (CRE) et Traitement d'Images
 """
@@ -6,3 +5,60 @@ Projet TIPE : Courbes Remplissant l'Espace (CRE) et Traitement d'Images
 __version__ = "1.0.0"
 __author__ = "Sami Ennedoui"
 __description__ = "Application des parcours fractals (Hilbert, Morton) au tramage et à la compression d'images."
+
+
+# Public functions, re-exported lazily (PEP 562): importing the package loads
+# nothing but this table, and `from src.processing import get_plan` imports only
+# the module that defines it. The experiment scripts next to these modules
+# are not part of the API and only run through their `main()`.
+_EXPORTS = {
+    "build_plan": "diffusion_plan",
+    "get_plan": "diffusion_plan",
+    "apply_plan": "diffusion_plan",
+    "apply_plan_packed": "diffusion_plan",
+    "dither_batch": "diffusion_plan",
+    "adaptive_palette": "palette_diffusion",
+    "nearest_colour_lut": "palette_diffusion",
+    "dither_palette": "palette_diffusion",
+    "dither_rgb_cube": "palette_diffusion",
+    "hilbert_palette": "palette_diffusion",
+    "palette_indices": "palette_diffusion",
+    "palette_image": "palette_diffusion",
+    "dither_hilbert_palette": "palette_diffusion",
+    "diffuse_raster": "raster_diffusion",
+    "wavefront_skew": "raster_diffusion",
+    "riemersma_dither": "riemersma",
+    "pack_image": "bitimage",
+    "save_bit_image": "bitimage",
+    "count_white": "bitimage",
+    "bit_entropy": "bitimage",
+    "bits_along": "bitimage",
+    "packed_compressed_size": "bitimage",
+    "open_grayscale_source": "streaming",
+    "stream_dither": "streaming",
+    "stream_dither_file": "streaming",
+    "stream_riemersma": "streaming",
+    "parallel_dither": "tile_parallel",
+    "colour_keys": "colour_curves",
+    "colour_order": "colour_curves",
+    "unique_colours": "colour_curves",
+    "encode_sfc": "sfc_container",
+    "decode_sfc": "sfc_container",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f"{__name__}.{module}"), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from src.metrics.compression_matrix import compressed_size
+
+
+# ----------------------------
+# Packed 1-bit images
+# ----------------------------
+# A dithered image is kept as the (height, ceil(width / 8)) uint8 array that
+# `np.packbits(..., axis=1)` produces: one bit per pixel, rows padded to whole
+# bytes, most significant bit first, 1 for white. This is also the raw layout
+# of PIL's mode "1", so exporting needs no unpacking.
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+@dataclass(frozen=True)
+class BitImage:
+    """
+    1-bit image of `width` pixels per row stored in a packed `bits` buffer.
+    Padding bits at the end of each row are always 0.
+    """
+
+    width: int
+    bits: np.ndarray
+
+    @property
+    def height(self) -> int:
+        return self.bits.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def unpack(self) -> np.ndarray:
+        """
+        (height, width) uint8 array of 0/1.
+        """
+        return np.unpackbits(self.bits, axis=1, count=self.width)
+
+
+def pack_image(image01: np.ndarray, threshold: float = 0.5) -> BitImage:
+    """
+    Pack a (height, width) array, setting the bits of pixels above `threshold`.
+    """
+    h, w = image01.shape
+    return BitImage(w, np.packbits(np.asarray(image01) > threshold, axis=1).reshape(h, -1))
+
+
+# ----------------------------
+# Export
+# ----------------------------
+def to_pil(image: BitImage) -> Image.Image:
+    """
+    Mode "1" PIL image read straight from the packed buffer.
+    """
+    bits = np.ascontiguousarray(image.bits)
+    return Image.frombuffer("1", (image.width, image.height), bits, "raw", "1", bits.shape[1], 1)
+
+
+def save_bit_image(image: BitImage, path: str | Path) -> None:
+    """
+    Save as a 1-bit PNG, or as a binary PBM (P4) when `path` ends in `.pbm`.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".pbm":
+        to_pil(image).save(path)
+    else:
+        to_pil(image).save(path, compress_level=0)
+
+
+# ----------------------------
+# Metrics on packed bits
+# ----------------------------
+def count_white(image: BitImage) -> int:
+    return int(_POPCOUNT[image.bits].sum(dtype=np.int64))
+
+
+def bit_entropy(image: BitImage) -> float:
+    """
+    Order-0 Shannon entropy in bits/pixel, from the share of white pixels.
+    Same value as the 256-bin histogram entropy of the unpacked 0/1 image.
+    """
+    n = image.width * image.height
+    if n == 0:
+        return 0.0
+    p = count_white(image) / n
+    if p in (0.0, 1.0):
+        return 0.0
+    return float(-(p * np.log2(p) + (1 - p) * np.log2(1 - p)))
+
+
+def bits_along(image: BitImage, path: np.ndarray | list[tuple[int, int]]) -> np.ndarray:
+    """
+    The 0/1 pixels of `image` read in the order of `path` ((x, y) points), straight from the
+    packed buffer.
+    """
+    coords = np.asarray(path, dtype=np.intp).reshape(-1, 2)
+    x, y = coords[:, 0], coords[:, 1]
+    return (image.bits[y, x >> 3] >> (7 - (x & 7))) & 1
+
+
+def packed_compressed_size(image: BitImage, codec: str = "gzip", level: int = 9) -> int:
+    """
+    Compressed size in bytes of the packed bit buffer.
+    """
+    return compressed_size(np.ascontiguousarray(image.bits).tobytes(), codec, level)
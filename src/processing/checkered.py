@@ -1,8 +1,17 @@
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.pdfgen import canvas
+import os
+import zlib
+
+import numpy as np
+
+# Format lettre US en points, comme reportlab.lib.pagesizes.letter
+LETTER = (612.0, 792.0)
+
 
 def creer_noiretblanc1():
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+    from reportlab.pdfgen import canvas
+
     dessin = canvas.Canvas("blacknwhite1.pdf", pagesize=letter)
     largeur, hauteur = letter
     taille_case = inch * 2
@@ -15,23 +24,63 @@ def creer_noiretblanc1():
     dessin.save()
 
 def creer_noiretblanc2():
-    dessin = canvas.Canvas("blacknwhite2.pdf", pagesize=letter)
-    largeur, hauteur = letter
-    lignes, colonnes = 50, 50
-    largeur_case = largeur / colonnes
-    hauteur_case = hauteur / lignes
-    for i in range(colonnes):
-        for j in range(lignes):
-            x = i * largeur_case
-            y = hauteur - (j + 1) * hauteur_case
-            dessin.setFillColorRGB(0, 0, 0) if (i + j) % 2 == 0 else dessin.setFillColorRGB(1, 1, 1)
-            dessin.rect(x, y, largeur_case, hauteur_case, fill=1, stroke=0)
-    dessin.save()
+    damier_pdf("blacknwhite2.pdf", 50, 50)
 
 def creer_noiretblanc3():
-    dessin = canvas.Canvas("blacknwhite3.pdf", pagesize=letter)
-    largeur, hauteur = letter
-    lignes, colonnes = 750,750
+    damier_pdf("blacknwhite3.pdf", 750, 750)
+
+
+# ----------------------------
+# Damiers rapides
+# ----------------------------
+# La case (i, j) (colonne i, ligne j depuis le haut) est noire si i + j est
+# pair. Plutôt qu'un rectangle par case, deux représentations compactes :
+#   "chemins" : un seul chemin rempli avec la règle pair-impair, fait des
+#               bandes des colonnes paires et des lignes impaires. Une case est
+#               couverte par exactement une bande si i est pair XOR j est impair,
+#               c'est-à-dire si i + j est pair : colonnes + lignes rectangles
+#               au lieu de colonnes * lignes.
+#   "image"   : une image 1 bit de colonnes x lignes pixels (XObject), étirée
+#               sur la page sans interpolation.
+# Le PDF est écrit directement (quelques objets), sans passer par reportlab.
+# Le mode "cases" garde l'ancien tracé case par case avec reportlab.
+def damier_pdf(nom_fichier, lignes, colonnes, mode="chemins", format_page=LETTER):
+    """
+    Écrit un damier lignes x colonnes couvrant la page dans `nom_fichier` et renvoie
+    la taille du fichier en octets.
+    """
+    if lignes <= 0 or colonnes <= 0:
+        raise ValueError(f"damier vide : {lignes} x {colonnes}")
+    largeur, hauteur = format_page
+    if mode == "cases":
+        _damier_reportlab(nom_fichier, lignes, colonnes, format_page)
+    elif mode == "chemins":
+        # Repère en unités de cases, origine en haut à gauche, y vers le bas.
+        contenu = [b"1 g 0 0 %.6f %.6f re f\n" % (largeur, hauteur),
+                   b"%.6f 0 0 %.6f 0 %.6f cm\n" % (largeur / colonnes, -hauteur / lignes, hauteur)]
+        contenu += [b"%d 0 1 %d re\n" % (i, lignes) for i in range(0, colonnes, 2)]
+        contenu += [b"0 %d %d 1 re\n" % (j, colonnes) for j in range(1, lignes, 2)]
+        contenu.append(b"0 g f*\n")
+        _ecrire_pdf(nom_fichier, format_page, b"".join(contenu))
+    elif mode == "image":
+        # 1 = blanc en DeviceGray ; une ligne paire commence par une case noire.
+        pair = np.packbits(np.arange(colonnes) % 2 == 1)
+        impair = np.packbits(np.arange(colonnes) % 2 == 0)
+        bits = np.tile(np.stack([pair, impair]), ((lignes + 1) // 2, 1))[:lignes]
+        image = (b"/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                 b"/BitsPerComponent 1 /Interpolate false" % (colonnes, lignes), bits.tobytes())
+        contenu = b"q %.6f 0 0 %.6f 0 0 cm /Im0 Do Q\n" % (largeur, hauteur)
+        _ecrire_pdf(nom_fichier, format_page, contenu, image)
+    else:
+        raise ValueError(f"mode inconnu {mode!r} : 'chemins', 'image' ou 'cases'")
+    return os.path.getsize(nom_fichier)
+
+
+def _damier_reportlab(nom_fichier, lignes, colonnes, format_page):
+    from reportlab.pdfgen import canvas
+
+    dessin = canvas.Canvas(nom_fichier, pagesize=format_page)
+    largeur, hauteur = format_page
     largeur_case = largeur / colonnes
     hauteur_case = hauteur / lignes
     for i in range(colonnes):
@@ -42,6 +91,46 @@ def creer_noiretblanc3():
             dessin.rect(x, y, largeur_case, hauteur_case, fill=1, stroke=0)
     dessin.save()
 
-creer_noiretblanc1()
-creer_noiretblanc2()
-creer_noiretblanc3()
\ No newline at end of file
+
+def _flux(dictionnaire, donnees):
+    donnees = zlib.compress(donnees, 6)
+    return (b"<< %s /Filter /FlateDecode /Length %d >>\nstream\n" % (dictionnaire, len(donnees))
+            + donnees + b"\nendstream")
+
+
+def _ecrire_pdf(nom_fichier, format_page, contenu, image=None):
+    """
+    PDF d'une page : `contenu` est le flux de dessin, `image` un éventuel
+    (dictionnaire, octets) d'image référencée comme /Im0.
+    """
+    ressources = b"<< /XObject << /Im0 5 0 R >> >>" if image is not None else b"<< >>"
+    objets = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.6f %.6f] /Resources %s /Contents 4 0 R >>"
+        % (format_page[0], format_page[1], ressources),
+        _flux(b"", contenu),
+    ]
+    if image is not None:
+        objets.append(_flux(*image))
+    sortie = bytearray(b"%PDF-1.4\n")
+    positions = []
+    for numero, objet in enumerate(objets, start=1):
+        positions.append(len(sortie))
+        sortie += b"%d 0 obj\n" % numero + objet + b"\nendobj\n"
+    debut_xref = len(sortie)
+    sortie += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objets) + 1)
+    sortie += b"".join(b"%010d 00000 n \n" % p for p in positions)
+    sortie += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objets) + 1, debut_xref)
+    with open(nom_fichier, "wb") as f:
+        f.write(sortie)
+
+
+def main():
+    creer_noiretblanc1()
+    creer_noiretblanc2()
+    creer_noiretblanc3()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-from hilbertcurve.hilbertcurve import HilbertCurve
-import pymorton
+from src.processing.colour_curves import colour_order
 
 components = [0, 50, 155, 255]
 
@@ -28,43 +25,46 @@ def scan_order(colors):
             scan_ordered.extend(sorted_colors[i+7:i-1:-1])
     return scan_ordered
 
+def curve_sort(colors, curve):
+    """Orders colors along a 3D curve of the 256^3 color cube (full 8-bit keys, one batch)"""
+    order = colour_order(np.array(colors, dtype=np.uint8).reshape(-1, 3), curve)
+    return [colors[i] for i in order]
+
 def hilbert_order(colors):
-    hilbert = HilbertCurve(3, 2) 
-    color_to_index = {}
-    for color in colors:
-        scaled = tuple(c//85 for c in color)
-        index = hilbert.distance_from_point(scaled)
-        color_to_index[color] = index
-    return sorted(colors, key=lambda c: color_to_index[c])
+    return curve_sort(colors, "hilbert3d")
 
 def morton_order(colors):
     """Orders colors using Morton/Z-order curve via bit interleaving"""
-    def morton_key(color):
-        # Scale to 0-3 and interleave bits
-        r, g, b = (c//85 for c in color)
-        return pymorton.interleave3(r, g, b)
-    return sorted(colors, key=morton_key)
+    return curve_sort(colors, "morton3d")
+
+
+def main():
+    import matplotlib.pyplot as plt
+
+    # Generate ordered color sequences
+    methods = {
+        "Sweep": sweep_order(colors),
+        "Scan": scan_order(colors),
+        "Hilbert": hilbert_order(colors),
+        "Morton": morton_order(colors)
+    }
+
+    # Create PDF visualizations
+    for method_name, ordered_colors in methods.items():
+        fig, ax = plt.subplots(figsize=(12, 2))
+        for i, color in enumerate(ordered_colors):
+            ax.add_patch(plt.Rectangle((i, 0), 1, 1, color=np.array(color)/255))
+            if i % 8 == 0:
+                ax.axvline(i, color='white', linestyle=':', alpha=0.5)
 
-# Generate ordered color sequences
-methods = {
-    "Sweep": sweep_order(colors),
-    "Scan": scan_order(colors),
-    "Hilbert": hilbert_order(colors),
-    "Morton": morton_order(colors)
-}
+        ax.set_xlim(0, len(ordered_colors))
+        ax.set_ylim(0, 1)
+        ax.axis('off')
 
-# Create PDF visualizations
-for method_name, ordered_colors in methods.items():
-    fig, ax = plt.subplots(figsize=(12, 2))
-    for i, color in enumerate(ordered_colors):
-        ax.add_patch(plt.Rectangle((i, 0), 1, 1, color=np.array(color)/255))
-        if i % 8 == 0:
-            ax.axvline(i, color='white', linestyle=':', alpha=0.5)
+        # Save as PNG instead of PDF
+        plt.savefig(f'{method_name}_color_sort.png', bbox_inches='tight', dpi=150)
+        plt.close()
 
-    ax.set_xlim(0, len(ordered_colors))
-    ax.set_ylim(0, 1)
-    ax.axis('off')
 
-    # Save as PNG instead of PDF
-    plt.savefig(f'{method_name}_color_sort.png', bbox_inches='tight', dpi=150)
-    plt.close()
+if __name__ == "__main__":
+    main()
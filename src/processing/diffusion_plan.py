@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+
+# ----------------------------
+# Error-diffusion kernels
+# ----------------------------
+# Each kernel is a tuple of (dx, dy, weight): the share of the quantization
+# error pushed to the pixel at (x + dx, y + dy).
+KERNELS: dict[str, tuple[tuple[int, int, float], ...]] = {
+    "atkinson": ((1, 0, 1 / 8), (2, 0, 1 / 8), (-1, 1, 1 / 8), (0, 1, 1 / 8), (1, 1, 1 / 8), (0, 2, 1 / 8)),
+    "floyd_steinberg": ((1, 0, 7 / 16), (-1, 1, 3 / 16), (0, 1, 5 / 16), (1, 1, 1 / 16)),
+}
+
+BUILD_CHUNK = 1 << 20
+APPLY_CHUNK = 1 << 16
+PLAN_CACHE_SIZE = 8
+
+
+@dataclass(frozen=True)
+class DiffusionPlan:
+    """
+    Error-diffusion schedule for one (path, width, height, kernel).
+
+    `order[i]` is the flat index (y * width + x) of the i-th visited pixel; its
+    in-bounds kernel targets are `targets[indptr[i]:indptr[i + 1]]` with the
+    matching `weights`, i.e. a CSR matrix with one row per step of the path.
+    Out-of-bounds neighbours are removed once at build time, so applying the
+    plan needs no bounds checks.
+    """
+
+    width: int
+    height: int
+    kernel: str
+    order: np.ndarray
+    indptr: np.ndarray
+    targets: np.ndarray
+    weights: np.ndarray
+
+    @property
+    def nbytes(self) -> int:
+        return self.order.nbytes + self.indptr.nbytes + self.targets.nbytes + self.weights.nbytes
+
+
+def _index_dtype(n: int) -> type:
+    return np.int32 if n < np.iinfo(np.int32).max else np.int64
+
+
+# ----------------------------
+# Plan construction
+# ----------------------------
+def build_plan(path: np.ndarray | list[tuple[int, int]], width: int, height: int,
+               kernel: str = "atkinson") -> DiffusionPlan:
+    """
+    Precompile the diffusion of `kernel` along `path` (a sequence of (x, y)) on a width x height grid.
+    """
+    offsets = np.array([(dx, dy) for dx, dy, _ in KERNELS[kernel]], dtype=np.int64)
+    kernel_weights = np.array([w for _, _, w in KERNELS[kernel]], dtype=np.float64)
+    coords = np.asarray(path, dtype=np.int64).reshape(-1, 2)
+    index_dtype = _index_dtype(width * height)
+
+    order_parts, count_parts, target_parts, weight_parts = [], [], [], []
+    for start in range(0, len(coords), BUILD_CHUNK):
+        x = coords[start:start + BUILD_CHUNK, 0:1]
+        y = coords[start:start + BUILD_CHUNK, 1:2]
+        nx = x + offsets[:, 0]
+        ny = y + offsets[:, 1]
+        valid = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        order_parts.append((y[:, 0] * width + x[:, 0]).astype(index_dtype))
+        count_parts.append(valid.sum(axis=1))
+        # Boolean indexing walks the (pixel, kernel slot) grid row by row, which
+        # keeps targets grouped by visit step and in kernel order.
+        target_parts.append((ny * width + nx)[valid].astype(index_dtype))
+        weight_parts.append(np.broadcast_to(kernel_weights, valid.shape)[valid])
+
+    if not order_parts:
+        empty = np.empty(0, dtype=index_dtype)
+        return DiffusionPlan(width, height, kernel, empty, np.zeros(1, dtype=np.int64), empty,
+                             np.empty(0, dtype=np.float64))
+
+    indptr = np.zeros(len(coords) + 1, dtype=np.int64)
+    np.cumsum(np.concatenate(count_parts), out=indptr[1:])
+    return DiffusionPlan(
+        width,
+        height,
+        kernel,
+        np.concatenate(order_parts),
+        indptr,
+        np.concatenate(target_parts),
+        np.concatenate(weight_parts),
+    )
+
+
+_plan_cache: OrderedDict[tuple, DiffusionPlan] = OrderedDict()
+
+
+def get_plan(path: np.ndarray | list[tuple[int, int]], width: int, height: int,
+             kernel: str = "atkinson") -> DiffusionPlan:
+    """
+    `build_plan` behind a small in-process LRU keyed by a digest of the path,
+    so dithering several images or channels of the same size builds the plan once.
+    """
+    coords = np.ascontiguousarray(np.asarray(path, dtype=np.int32).reshape(-1, 2))
+    digest = hashlib.blake2b(coords.view(np.uint8), digest_size=16).hexdigest()
+    key = (digest, width, height, kernel)
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = build_plan(coords, width, height, kernel)
+        _plan_cache[key] = plan
+        if len(_plan_cache) > PLAN_CACHE_SIZE:
+            _plan_cache.popitem(last=False)
+    else:
+        _plan_cache.move_to_end(key)
+    return plan
+
+
+# ----------------------------
+# Plan application
+# ----------------------------
+def run_plan(plan: DiffusionPlan, work: list[float] | array, out: bytearray, threshold: float = 0.5,
+             packed: bool = False) -> None:
+    """
+    Run `plan` over a flat list of intensities, in place: visited pixels are set
+    to 1 in `out` when they quantize to white, and the remaining error is left in
+    `work` (including in cells that the path never visits).
+
+    With `packed=True`, `out` is a bit buffer laid out like `np.packbits(axis=1)`
+    (rows padded to whole bytes, most significant bit first) and white pixels set
+    their bit instead of a whole byte.
+
+    `work` may also be an `array("f")`: every error and every updated intensity is
+    then rounded to float32, as in a float32 image updated in place.
+    """
+    row_bytes = (plan.width + 7) // 8
+    single = getattr(work, "typecode", None) == "f"
+    rounder = array("f", [0.0])
+    # The plan is converted to Python lists one chunk at a time: list indexing
+    # is what makes the loop fast, and chunking bounds the memory it costs.
+    for start in range(0, len(plan.order), APPLY_CHUNK):
+        stop = min(start + APPLY_CHUNK, len(plan.order))
+        base = int(plan.indptr[start])
+        chunk_order = plan.order[start:stop]
+        order = chunk_order.tolist()
+        bounds = (plan.indptr[start:stop + 1] - base).tolist()
+        targets = plan.targets[base:plan.indptr[stop]].tolist()
+        weights = plan.weights[base:plan.indptr[stop]].tolist()
+        if not packed:
+            for i, p in enumerate(order):
+                old = work[p]
+                if old > threshold:
+                    out[p] = 1
+                    err = old - 1.0
+                    if single:
+                        rounder[0] = err
+                        err = rounder[0]
+                else:
+                    err = old
+                for j in range(bounds[i], bounds[i + 1]):
+                    work[targets[j]] += err * weights[j]
+            continue
+
+        x = chunk_order % plan.width
+        cells = ((chunk_order // plan.width) * row_bytes + (x >> 3)).tolist()
+        bits = (0x80 >> (x & 7)).tolist()
+        for i, p in enumerate(order):
+            old = work[p]
+            if old > threshold:
+                out[cells[i]] |= bits[i]
+                err = old - 1.0
+                if single:
+                    rounder[0] = err
+                    err = rounder[0]
+            else:
+                err = old
+            for j in range(bounds[i], bounds[i + 1]):
+                work[targets[j]] += err * weights[j]
+
+
+def _work_list(image01: np.ndarray) -> list[float] | array:
+    """
+    Flat work values of an image: float32 images keep float32 storage, anything else float64.
+    """
+    if image01.dtype == np.float32:
+        return array("f", np.ascontiguousarray(image01).tobytes())
+    return np.asarray(image01, dtype=np.float64).ravel().tolist()
+
+
+def apply_plan(plan: DiffusionPlan, image01: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """
+    Dither a (height, width) image in [0, 1] to {0, 1} by running `plan`.
+    The output has the dtype of the input. Error is accumulated in float64, or in
+    float32 for float32 images, which gives the same result as updating a float32
+    copy of the image pixel by pixel.
+    """
+    h, w = image01.shape
+    if (w, h) != (plan.width, plan.height):
+        raise ValueError(f"plan is for {plan.width}x{plan.height}, image is {w}x{h}")
+
+    work = _work_list(image01)
+    out = bytearray(w * h)
+    run_plan(plan, work, out, threshold)
+    return np.frombuffer(out, dtype=np.uint8).reshape(h, w).astype(image01.dtype)
+
+
+def apply_plan_packed(plan: DiffusionPlan, image01: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """
+    `apply_plan` writing straight into a bit buffer: returns the (height, ceil(width / 8))
+    uint8 array that `np.packbits(apply_plan(...) > 0, axis=1)` would give, without the
+    one-byte-per-pixel intermediate.
+    """
+    h, w = image01.shape
+    if (w, h) != (plan.width, plan.height):
+        raise ValueError(f"plan is for {plan.width}x{plan.height}, image is {w}x{h}")
+
+    work = _work_list(image01)
+    out = bytearray(h * ((w + 7) // 8))
+    run_plan(plan, work, out, threshold, packed=True)
+    return np.frombuffer(out, dtype=np.uint8).reshape(h, -1)
+
+
+def dither_batch(images01: np.ndarray, path: np.ndarray | list[tuple[int, int]],
+                 kernel: str = "atkinson", threshold: float = 0.5) -> np.ndarray:
+    """
+    Dither a stack of same-size images (n, height, width): one plan build, n applies.
+    """
+    _, h, w = images01.shape
+    plan = get_plan(path, w, h, kernel)
+    return np.stack([apply_plan(plan, image, threshold) for image in images01])
@@ -1,5 +1,6 @@
 import numpy as np
 from PIL import Image
+from src.processing.raster_diffusion import diffuse_raster
 
 def quantifier(pixel):
     return 255 if pixel > 127 else 0
@@ -12,51 +13,14 @@ def quantifier_image(image):
                 resultat[y, x, canal] = quantifier(resultat[y, x, canal])
     return resultat.astype(np.uint8)
 
+# Balayage ligne par ligne, calculé par fronts d'onde (raster_diffusion.py) :
+# résultat identique bit à bit à la boucle pixel par pixel
+# (diffuse_raster_reference), mais en opérations vectorisées.
 def diffusion_atkinson(image):
-    h, l, c = image.shape
-    resultat = np.copy(image).astype(float)
-    for canal in range(c):
-        for y in range(h):
-            for x in range(l):
-                ancien = resultat[y, x, canal]
-                nouveau = quantifier(ancien)
-                resultat[y, x, canal] = nouveau
-                erreur = (ancien - nouveau) / 8
-                if x + 1 < l:
-                    resultat[y, x + 1, canal] += erreur
-                if x + 2 < l:
-                    resultat[y, x + 2, canal] += erreur
-                if y + 1 < h:
-                    if x - 1 >= 0:
-                        resultat[y + 1, x - 1, canal] += erreur
-                    resultat[y + 1, x, canal] += erreur
-                    if x + 1 < l:
-                        resultat[y + 1, x + 1, canal] += erreur
-                if y + 2 < h:
-                    resultat[y + 2, x, canal] += erreur
-    np.clip(resultat, 0, 255, out=resultat)
-    return resultat.astype(np.uint8)
+    return diffuse_raster(image, "atkinson")
 
 def diffusion_floyd_steinberg(image):
-    h, l, c = image.shape
-    resultat = np.copy(image).astype(float)
-    for canal in range(c):
-        for y in range(h):
-            for x in range(l):
-                ancien = resultat[y, x, canal]
-                nouveau = quantifier(ancien)
-                resultat[y, x, canal] = nouveau
-                erreur = ancien - nouveau
-                if x + 1 < l:
-                    resultat[y, x + 1, canal] += erreur * 7 / 16
-                if y + 1 < h:
-                    if x - 1 >= 0:
-                        resultat[y + 1, x - 1, canal] += erreur * 3 / 16
-                    resultat[y + 1, x, canal] += erreur * 5 / 16
-                    if x + 1 < l:
-                        resultat[y + 1, x + 1, canal] += erreur * 1 / 16
-    np.clip(resultat, 0, 255, out=resultat)
-    return resultat.astype(np.uint8)
+    return diffuse_raster(image, "floyd_steinberg")
 
 def creer_image_test():
     return np.array([
@@ -71,12 +35,19 @@ def sauvegarder_image(nom, matrice, facteur=50):
     taille = (matrice.shape[1] * facteur, matrice.shape[0] * facteur)
     img = img.resize(taille, resample=Image.NEAREST)
     img.save(nom)
-image_originale = creer_image_test()
-image_quantifiee = quantifier_image(image_originale)
-image_atkinson = diffusion_atkinson(image_originale)
-image_floyd = diffusion_floyd_steinberg(image_originale)
 
-sauvegarder_image('originale.png', image_originale)
-sauvegarder_image('quantifiee.png', image_quantifiee)
-sauvegarder_image('atkinson.png', image_atkinson)
-sauvegarder_image('floyd.png', image_floyd)
+
+def main():
+    image_originale = creer_image_test()
+    image_quantifiee = quantifier_image(image_originale)
+    image_atkinson = diffusion_atkinson(image_originale)
+    image_floyd = diffusion_floyd_steinberg(image_originale)
+
+    sauvegarder_image('originale.png', image_originale)
+    sauvegarder_image('quantifiee.png', image_quantifiee)
+    sauvegarder_image('atkinson.png', image_atkinson)
+    sauvegarder_image('floyd.png', image_floyd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from src.metrics.compression_matrix import as_u8
+from src.processing.colour_curves import unique_colours
+from src.processing.diffusion_plan import APPLY_CHUNK, DiffusionPlan, get_plan
+
+
+# ----------------------------
+# Palettes
+# ----------------------------
+# Palettes are (n, 3) float arrays in [0, 1]. The 1-bit RGB cube reproduces the
+# per-channel thresholding of `dither_rgb_1bit`, in a single pass.
+RGB_CUBE_PALETTE = np.array(
+    [(r, g, b) for r in (0.0, 1.0) for g in (0.0, 1.0) for b in (0.0, 1.0)], dtype=np.float64
+)
+
+LUT_LEVELS = 32
+LUT_CACHE_SIZE = 16
+LUT_TIE_TOLERANCE = 1e-9
+LUT_TIE_BLOCK = 1024
+
+
+def adaptive_palette(image_rgb01: np.ndarray, colors: int = 8) -> np.ndarray:
+    """
+    Median-cut palette of `colors` entries (2..256) computed by PIL, as an (n, 3) array in [0, 1].
+    """
+    img = Image.fromarray((np.clip(image_rgb01, 0, 1) * 255).astype(np.uint8), mode="RGB")
+    quantized = img.quantize(colors=colors, method=Image.MEDIANCUT)
+    palette = np.array(quantized.getpalette()[:3 * colors], dtype=np.float64).reshape(-1, 3)
+    return palette / 255.0
+
+
+def _split_run(weights: np.ndarray, sums: np.ndarray, squares: np.ndarray,
+               start: int, end: int) -> tuple[float, int]:
+    """
+    Best cut of the run [start, end) of curve-ordered colours, from prefix sums of counts,
+    count-weighted colours and count-weighted squared norms: (SSE removed, cut position).
+    """
+    def sse(lo, hi):
+        s = sums[hi] - sums[lo]
+        return squares[hi] - squares[lo] - (s * s).sum(axis=-1) / (weights[hi] - weights[lo])
+
+    cuts = np.arange(start + 1, end)
+    cost = sse(np.full(len(cuts), start), cuts) + sse(cuts, np.full(len(cuts), end))
+    best = int(np.argmin(cost))
+    return float(sse(np.array([start]), np.array([end]))[0] - cost[best]), int(cuts[best])
+
+
+def hilbert_palette(image_rgb01: np.ndarray, colors: int = 8, curve: str = "hilbert3d",
+                    split: str = "weight") -> np.ndarray:
+    """
+    Palette of at most `colors` entries (2..256), as an (n, 3) array in [0, 1]: the distinct
+    colours of the image, ordered along a 3D curve of the RGB cube, are cut into `colors`
+    runs, and each run gives its count-weighted mean colour.
+
+    split="weight" cuts runs of about the same pixel count, in one pass over the sorted
+    colours: the fast path. split="spread" cuts, starting from a single run, the run whose
+    best cut removes the most squared error (count-weighted), until there are `colors` runs:
+    slower, but with a lower error. Images with at most `colors` distinct colours get
+    exactly those colours.
+    """
+    if not 2 <= colors <= 256:
+        raise ValueError(f"palettes have 2 to 256 colours, got {colors}")
+    if split not in ("weight", "spread"):
+        raise ValueError(f"unknown split {split!r}, expected 'weight' or 'spread'")
+    colours, counts = unique_colours(as_u8(image_rgb01), curve)
+    if len(colours) <= colors:
+        return colours.astype(np.float64) / 255.0
+    values = colours.astype(np.float64)
+    if split == "weight":
+        # Run i ends where the cumulative count first reaches (i + 1) / colors of the pixels,
+        # nudged so that all runs are non-empty.
+        cumulative = np.cumsum(counts)
+        steps = np.arange(1, colors)
+        ends = np.searchsorted(cumulative, cumulative[-1] * steps / colors, side="left") + 1
+        ends = np.clip(ends, steps, len(colours) - colors + steps)
+        ends = np.maximum.accumulate(ends - steps) + steps
+        starts = np.concatenate([[0], ends])
+        weights = np.add.reduceat(counts, starts).astype(np.float64)
+        sums = np.add.reduceat(values * counts[:, None], starts, axis=0)
+        return sums / weights[:, None] / 255.0
+
+    counts = counts.astype(np.float64)
+    weights = np.concatenate([[0.0], np.cumsum(counts)])
+    sums = np.concatenate([np.zeros((1, 3)), np.cumsum(values * counts[:, None], axis=0)])
+    squares = np.concatenate([[0.0], np.cumsum((values * values).sum(axis=1) * counts)])
+
+    # Max-heap of the runs that can still be cut, by the error their best cut removes.
+    gain, cut = _split_run(weights, sums, squares, 0, len(values))
+    heap, done = [(-gain, 0, len(values), cut)], []
+    while heap and len(heap) + len(done) < colors:
+        _, start, end, cut = heapq.heappop(heap)
+        for lo, hi in ((start, cut), (cut, end)):
+            if hi - lo > 1:
+                gain, at = _split_run(weights, sums, squares, lo, hi)
+                heapq.heappush(heap, (-gain, lo, hi, at))
+            else:
+                done.append((lo, hi))
+    runs = sorted(done + [(start, end) for _, start, end, _ in heap])
+    starts = np.array([start for start, _ in runs])
+    ends = np.array([end for _, end in runs])
+    return (sums[ends] - sums[starts]) / (weights[ends] - weights[starts])[:, None] / 255.0
+
+
+def _lut_cells(image_rgb01: np.ndarray, levels: int) -> np.ndarray:
+    """
+    Flat `nearest_colour_lut` cell of every pixel, with the rounding of `run_palette_plan`.
+    """
+    top = levels - 1
+    cells = top - np.floor((1.0 - np.asarray(image_rgb01, dtype=np.float64)) * levels).astype(np.int64)
+    np.clip(cells, 0, top, out=cells)
+    return (cells[..., 0] * levels + cells[..., 1]) * levels + cells[..., 2]
+
+
+def palette_indices(image_rgb01: np.ndarray, palette: np.ndarray, levels: int = LUT_LEVELS) -> np.ndarray:
+    """
+    (h, w) uint8 index of the nearest palette colour of every pixel, without diffusion,
+    read from the cached `nearest_colour_lut`.
+    """
+    return nearest_colour_lut(palette, levels)[_lut_cells(image_rgb01, levels)]
+
+
+def palette_image(indices: np.ndarray, palette: np.ndarray) -> Image.Image:
+    """
+    Mode "P" PIL image of palette indices, ready to be saved as an indexed PNG.
+    """
+    img = Image.fromarray(np.ascontiguousarray(indices, dtype=np.uint8), mode="P")
+    img.putpalette((np.clip(palette, 0, 1) * 255).round().astype(np.uint8).ravel().tolist())
+    return img
+
+
+# ----------------------------
+# Nearest-colour lookup table
+# ----------------------------
+_lut_cache: OrderedDict[tuple, np.ndarray] = OrderedDict()
+
+
+def nearest_colour_lut(palette: np.ndarray, levels: int = LUT_LEVELS) -> np.ndarray:
+    """
+    Index of the nearest palette entry for every cell of a levels^3 grid over the RGB cube,
+    flattened as `lut[(r * levels + g) * levels + b]`. Cell i of an axis covers
+    (i / levels, (i + 1) / levels] and is represented by its centre.
+    Tables are cached per (palette, levels).
+    """
+    palette = np.ascontiguousarray(palette, dtype=np.float64)
+    key = (hashlib.blake2b(palette.tobytes(), digest_size=16).hexdigest(), palette.shape[0], levels)
+    lut = _lut_cache.get(key)
+    if lut is not None:
+        _lut_cache.move_to_end(key)
+        return lut
+
+    centres = (np.arange(levels) + 0.5) / levels
+    grid = np.stack(np.meshgrid(centres, centres, centres, indexing="ij"), axis=-1).reshape(-1, 3)
+    # |g - c|^2 = |g|^2 - 2 g.c + |c|^2: one matrix product ranks all entries for all cells.
+    # The expansion rounds differently from the direct distance, so cells whose two best
+    # entries are within rounding of each other are re-decided with exact distances, first
+    # entry winning ties, as a scan of the palette that only replaces on a strict improvement.
+    scores = np.dot(grid, -2.0 * palette.T)
+    scores += (palette * palette).sum(axis=1)
+    best = np.argmin(scores, axis=1).astype(np.uint8)
+    if len(palette) > 1:
+        rows = np.arange(len(grid))
+        nearest = scores[rows, best]
+        scores[rows, best] = np.inf
+        close = np.flatnonzero(np.min(scores, axis=1) - nearest <= LUT_TIE_TOLERANCE)
+        for start in range(0, len(close), LUT_TIE_BLOCK):
+            cells = close[start:start + LUT_TIE_BLOCK]
+            dist = ((grid[cells, None, :] - palette[None, :, :]) ** 2).sum(axis=2)
+            best[cells] = np.argmin(dist, axis=1)
+
+    _lut_cache[key] = best
+    if len(_lut_cache) > LUT_CACHE_SIZE:
+        _lut_cache.popitem(last=False)
+    return best
+
+
+# ----------------------------
+# Joint vector error diffusion
+# ----------------------------
+def run_palette_plan(plan: DiffusionPlan, work: list[float], out: bytearray,
+                     palette: np.ndarray, levels: int = LUT_LEVELS) -> None:
+    """
+    Run `plan` over interleaved RGB intensities (`work[3 * p + c]`), in place: each visited
+    pixel gets the index of its nearest palette colour in `out` and the whole colour error
+    vector is diffused at once.
+    """
+    if len(palette) > 256:
+        raise ValueError("palettes are limited to 256 colours")
+    lut = nearest_colour_lut(palette, levels).tolist()
+    pr, pg, pb = (palette[:, c].tolist() for c in range(3))
+    top = levels - 1
+
+    for start in range(0, len(plan.order), APPLY_CHUNK):
+        stop = min(start + APPLY_CHUNK, len(plan.order))
+        base = int(plan.indptr[start])
+        order = plan.order[start:stop].tolist()
+        bounds = (plan.indptr[start:stop + 1] - base).tolist()
+        targets = plan.targets[base:plan.indptr[stop]].tolist()
+        weights = plan.weights[base:plan.indptr[stop]].tolist()
+        for i, p in enumerate(order):
+            q = 3 * p
+            r, g, b = work[q], work[q + 1], work[q + 2]
+            # Grid cell of each channel, clamped to the cube.
+            ri = top - int((1.0 - r) * levels)
+            gi = top - int((1.0 - g) * levels)
+            bi = top - int((1.0 - b) * levels)
+            ri = 0 if ri < 0 else (top if ri > top else ri)
+            gi = 0 if gi < 0 else (top if gi > top else gi)
+            bi = 0 if bi < 0 else (top if bi > top else bi)
+            k = lut[(ri * levels + gi) * levels + bi]
+            out[p] = k
+            er, eg, eb = r - pr[k], g - pg[k], b - pb[k]
+            for j in range(bounds[i], bounds[i + 1]):
+                t = 3 * targets[j]
+                wj = weights[j]
+                work[t] += er * wj
+                work[t + 1] += eg * wj
+                work[t + 2] += eb * wj
+
+
+def dither_palette(image_rgb01: np.ndarray, path: np.ndarray | list[tuple[int, int]],
+                   palette: np.ndarray, kernel: str = "atkinson", levels: int = LUT_LEVELS) -> np.ndarray:
+    """
+    Dither an (h, w, 3) image in [0, 1] onto `palette` along `path` in one traversal.
+    Returns the (h, w) uint8 image of palette indices.
+    """
+    h, w, _ = image_rgb01.shape
+    plan = get_plan(path, w, h, kernel)
+    work = np.asarray(image_rgb01, dtype=np.float64).ravel().tolist()
+    out = bytearray(w * h)
+    run_palette_plan(plan, work, out, np.asarray(palette, dtype=np.float64), levels)
+    return np.frombuffer(out, dtype=np.uint8).reshape(h, w)
+
+
+def dither_hilbert_palette(image_rgb01: np.ndarray, path: np.ndarray | list[tuple[int, int]],
+                           colors: int = 8, kernel: str = "atkinson",
+                           split: str = "weight") -> tuple[np.ndarray, np.ndarray]:
+    """
+    `dither_palette` onto the image's own `hilbert_palette`. Returns (indices, palette).
+    """
+    palette = hilbert_palette(image_rgb01, colors, split=split)
+    return dither_palette(image_rgb01, path, palette, kernel), palette
+
+
+def dither_rgb_cube(image_rgb01: np.ndarray, path: np.ndarray | list[tuple[int, int]],
+                    kernel: str = "atkinson") -> np.ndarray:
+    """
+    1-bit-per-channel colour dithering: same result as dithering R, G and B separately,
+    in a single pass over the path. Returns an (h, w, 3) array of 0/1 with the input dtype.
+    """
+    indices = dither_palette(image_rgb01, path, RGB_CUBE_PALETTE, kernel)
+    return RGB_CUBE_PALETTE.astype(image_rgb01.dtype)[indices]
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+# ----------------------------
+# Raster kernels (0..255 scale)
+# ----------------------------
+# Same conventions as errordiff.py: intensities stay in 0..255 floats, a pixel
+# becomes 255 if it is above 127 and 0 otherwise, and the neighbour (x + dx,
+# y + dy) receives `erreur * numerator / divisor`, in that order of operations.
+RASTER_KERNELS: dict[str, tuple[int, tuple[tuple[int, int, int], ...]]] = {
+    "floyd_steinberg": (16, ((1, 0, 7), (-1, 1, 3), (0, 1, 5), (1, 1, 1))),
+    "atkinson": (8, ((1, 0, 1), (2, 0, 1), (-1, 1, 1), (0, 1, 1), (1, 1, 1), (0, 2, 1))),
+    "jarvis_judice_ninke": (48, ((1, 0, 7), (2, 0, 5),
+                                 (-2, 1, 3), (-1, 1, 5), (0, 1, 7), (1, 1, 5), (2, 1, 3),
+                                 (-2, 2, 1), (-1, 2, 3), (0, 2, 5), (1, 2, 3), (2, 2, 1))),
+    "stucki": (42, ((1, 0, 8), (2, 0, 4),
+                    (-2, 1, 2), (-1, 1, 4), (0, 1, 8), (1, 1, 4), (2, 1, 2),
+                    (-2, 2, 1), (-1, 2, 2), (0, 2, 4), (1, 2, 2), (2, 2, 1))),
+    "sierra": (32, ((1, 0, 5), (2, 0, 3),
+                    (-2, 1, 2), (-1, 1, 4), (0, 1, 5), (1, 1, 4), (2, 1, 2),
+                    (-1, 2, 2), (0, 2, 3), (1, 2, 2))),
+}
+
+THRESHOLD = 127
+
+
+def raster_kernel(kernel: str) -> tuple[int, tuple[tuple[int, int, int], ...]]:
+    try:
+        return RASTER_KERNELS[kernel]
+    except KeyError:
+        raise ValueError(f"unknown kernel {kernel!r}, expected one of {', '.join(RASTER_KERNELS)}") from None
+
+
+def diffuse_raster_reference(image: np.ndarray, kernel: str = "floyd_steinberg") -> np.ndarray:
+    """
+    Sequential raster diffusion, pixel by pixel and channel by channel like errordiff.py:
+    the reference that `diffuse_raster` reproduces bit for bit. Only usable on small images.
+    """
+    divisor, taps = raster_kernel(kernel)
+    work = np.array(image, dtype=float)
+    flat = work.reshape(work.shape[0], work.shape[1], -1)
+    h, w, c = flat.shape
+    for channel in range(c):
+        for y in range(h):
+            for x in range(w):
+                old = flat[y, x, channel]
+                new = 255 if old > THRESHOLD else 0
+                flat[y, x, channel] = new
+                err = old - new
+                for dx, dy, numerator in taps:
+                    if 0 <= x + dx < w and y + dy < h:
+                        flat[y + dy, x + dx, channel] += err * numerator / divisor
+    np.clip(work, 0, 255, out=work)
+    return work.astype(np.uint8)
+
+
+# ----------------------------
+# Wavefront schedule
+# ----------------------------
+# Pixel (x, y) is quantized at step t = x + skew * y, and all pixels of one
+# step (an anti-diagonal) are processed together. Two conditions on the skew
+# keep the result identical to the raster loop, not just equivalent:
+#   - causality: every target is quantized at a later step than its sources,
+#     dx + skew * dy > 0 for each tap;
+#   - addition order: float sums are not associative, so the contributions to
+#     a pixel must arrive in the raster order of their sources. A source on an
+#     earlier row must not be at a later step, skew * (dy1 - dy2) >= dx2 - dx1
+#     for taps with dy1 > dy2; sources that share a step are handled by adding
+#     the taps in decreasing dy.
+# Floyd-Steinberg needs a skew of 2, Atkinson 3 and the 5-wide kernels 4.
+def wavefront_skew(kernel: str) -> int:
+    """
+    Smallest step offset between consecutive rows that keeps `diffuse_raster` bit-identical.
+    """
+    _, taps = raster_kernel(kernel)
+    skew = 1
+    for dx, dy, _ in taps:
+        if dy > 0:
+            skew = max(skew, -dx // dy + 1)
+    for dx1, dy1, _ in taps:
+        for dx2, dy2, _ in taps:
+            if dy1 > dy2:
+                skew = max(skew, -((dx1 - dx2) // (dy1 - dy2)))
+    return skew
+
+
+def diffuse_raster(image: np.ndarray, kernel: str = "floyd_steinberg") -> np.ndarray:
+    """
+    Raster error diffusion of a (h, w) or (h, w, channels) image in 0..255, processed by
+    anti-diagonal wavefronts: about w + skew * h vector steps instead of w * h * channels
+    Python iterations. Returns uint8, bit-identical to `diffuse_raster_reference`.
+    """
+    divisor, taps = raster_kernel(kernel)
+    image = np.asarray(image)
+    h, w = image.shape[:2]
+    channels = image.reshape(h, w, -1).shape[2]
+    skew = wavefront_skew(kernel)
+    margin = max(abs(dx) for dx, _, _ in taps)
+    depth = max(dy for _, dy, _ in taps)
+
+    # Padded work buffer: targets outside the image land in the margins. Cell
+    # (x, y) of the padded grid, f = y * pitch + margin + x, is stored at
+    # lanes[f % stride, f // stride] with stride = pitch - skew: the pixels of
+    # one step then share the first index, so each step and each tap is one
+    # contiguous slice.
+    pitch = max(w + 2 * margin, skew + 1)
+    stride = pitch - skew
+    rows = -(-(h + depth + 1) * pitch // stride)
+    lanes = np.zeros((stride, rows, channels), dtype=float)
+    cells = (np.arange(h)[:, None] * pitch + margin + np.arange(w)).ravel()
+    lanes[cells % stride, cells // stride] = image.reshape(h * w, channels)
+
+    # Taps grouped by weight (one share per distinct numerator), applied in decreasing dy.
+    # With a power-of-two divisor, `err * (numerator / divisor)` rounds exactly like
+    # `err * numerator / divisor` and saves one pass.
+    order = sorted(range(len(taps)), key=lambda i: -taps[i][1])
+    numerators = sorted({numerator for _, _, numerator in taps})
+    shifts = [(taps[i][1], taps[i][0] + skew * taps[i][1], numerators.index(taps[i][2])) for i in order]
+    exact = divisor & (divisor - 1) == 0
+
+    for t in range(w + skew * (h - 1)):
+        y0 = max(0, -(-(t - w + 1) // skew))
+        y1 = min(h - 1, t // skew) + 1
+        row, col = divmod(margin + t, stride)
+        wave = lanes[col, row + y0:row + y1]
+        old = wave.copy()
+        new = (old > THRESHOLD) * 255.0
+        wave[...] = new
+        err = old - new
+        if exact:
+            shares = [err * (numerator / divisor) for numerator in numerators]
+        else:
+            shares = [err * numerator / divisor for numerator in numerators]
+        for dy, shift, k in shifts:
+            trow, tcol = divmod(margin + t + shift, stride)
+            lanes[tcol, trow + y0 + dy:trow + y1 + dy] += shares[k]
+
+    result = lanes[cells % stride, cells // stride]
+    np.clip(result, 0, 255, out=result)
+    return result.astype(np.uint8).reshape(image.shape)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+
+from src.curves.registry import DEFAULT_CHUNK, get_curve
+
+QUEUE_LENGTH = 16
+WEIGHT_RATIO = 16.0
+
+
+# ----------------------------
+# Riemersma dithering
+# ----------------------------
+# Instead of pushing error onto 2D neighbours (which, along a curve, are often
+# already visited), each pixel is corrected by a weighted sum of the errors of
+# the last `length` pixels of the curve itself, the newest with weight 1 and
+# the oldest with weight 1 / ratio. As in Riemersma's original algorithm the
+# stored error is the input value minus the output, not the corrected value.
+# Pixels are consumed strictly in curve order and the whole state is the
+# error history, so chunks of any traversal can be fed one after the other.
+#
+# The weights are geometric, w_k = q^k with q = ratio^(-1 / (length - 1)), so
+# the weighted sum is updated in O(1) per pixel: S <- err + q * S - q^length * oldest.
+class RiemersmaQueue:
+    """
+    Error history of Riemersma dithering, carried from one chunk of pixels to the next.
+    """
+
+    def __init__(self, length: int = QUEUE_LENGTH, ratio: float = WEIGHT_RATIO, threshold: float = 0.5):
+        if length < 1 or ratio < 1:
+            raise ValueError(f"need length >= 1 and ratio >= 1, got {length} and {ratio}")
+        self.length = length
+        self.decay = ratio ** (-1.0 / (length - 1)) if length > 1 else 0.0
+        self.threshold = threshold
+        self.history = [0.0] * length
+        self.position = 0
+        self.total = 0.0
+
+    def weights(self) -> np.ndarray:
+        """
+        Weight of each stored error, newest first.
+        """
+        return self.decay ** np.arange(self.length) if self.length > 1 else np.ones(1)
+
+    def dither(self, values: np.ndarray) -> np.ndarray:
+        """
+        Dither the next pixels of the traversal (1D, in [0, 1]) to a uint8 array of {0, 1}.
+        """
+        decay, threshold, history = self.decay, self.threshold, self.history
+        drop = decay ** self.length
+        position, length, total = self.position, self.length, self.total
+        out = bytearray(len(values))
+        for i, value in enumerate(np.asarray(values, dtype=np.float64).tolist()):
+            if value + total > threshold:
+                out[i] = 1
+                err = value - 1.0
+            else:
+                err = value
+            total = err + decay * total - drop * history[position]
+            history[position] = err
+            position += 1
+            if position == length:
+                position = 0
+        self.position, self.total = position, total
+        return np.frombuffer(out, dtype=np.uint8)
+
+
+def riemersma_dither(image01: np.ndarray, curve: str = "hilbert", length: int = QUEUE_LENGTH,
+                     ratio: float = WEIGHT_RATIO, threshold: float = 0.5,
+                     chunk: int = DEFAULT_CHUNK) -> np.ndarray:
+    """
+    Dither a (height, width) image in [0, 1] to {0, 1} along a 2D curve of the registry,
+    reading its traversal `chunk` points at a time. The output has the dtype of the input.
+    """
+    if get_curve(curve).dims != 2:
+        raise ValueError(f"{curve!r} is not a 2D curve")
+    h, w = image01.shape
+    queue = RiemersmaQueue(length, ratio, threshold)
+    out = np.zeros((h, w), dtype=np.uint8)
+    for points in get_curve(curve).iter_order(w, h, chunk=chunk):
+        x, y = points[:, 0], points[:, 1]
+        out[y, x] = queue.dither(image01[y, x])
+    return out.astype(image01.dtype)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import mmap
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from src.curves.registry import get_curve
+from src.metrics.compression_matrix import CODECS, DECOMPRESSORS, as_u8
+
+
+# ----------------------------
+# .sfc container layout
+# ----------------------------
+# header | tile index | tile payloads
+#
+# The image is cut into tile x tile blocks. Payloads are written in the order
+# the tiles are visited along the curve, and the pixels of each tile are
+# serialized along the same curve (channels interleaved) and compressed on
+# their own. The index has one (offset, length) entry per tile in raster tile
+# order, so the tiles overlapping a region are found by arithmetic and read
+# through a memory map without touching the rest of the file.
+MAGIC = b"SFCI"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHIII16s8s")
+_INDEX_DTYPE = np.dtype([("offset", "<u8"), ("length", "<u4")])
+
+
+# ----------------------------
+# Streaming encoder
+# ----------------------------
+def encode_sfc(source: np.ndarray, output_path: str | Path, tile: int = 256, curve: str = "hilbert",
+               codec: str = "zlib", level: int = 9) -> dict:
+    """
+    Write an (h, w) or (h, w, c) image (uint8, or floats in [0, 1]) to an `.sfc` file.
+
+    The source is read one tile at a time, so a memory-mapped source (see
+    `streaming.open_grayscale_source`) is encoded without being loaded. Returns a small
+    summary: image size, number of tiles, raw and file sizes.
+    """
+    if tile <= 0:
+        raise ValueError(f"tile size must be positive, got {tile}")
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r}, expected one of {', '.join(CODECS)}")
+    if get_curve(curve).dims != 2:
+        raise ValueError(f"{curve!r} is not a 2D curve")
+    order_fn = get_curve(curve).order
+    height, width = source.shape[:2]
+    channels = source.shape[2] if source.ndim == 3 else 1
+    if width == 0 or height == 0:
+        raise ValueError("cannot encode an empty image")
+
+    grid_w, grid_h = -(-width // tile), -(-height // tile)
+    index = np.zeros(grid_w * grid_h, dtype=_INDEX_DTYPE)
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, channels, width, height, tile,
+                          curve.encode("ascii"), codec.encode("ascii"))
+    paths: dict[tuple[int, int], np.ndarray] = {}
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(header)
+        f.write(index.tobytes())
+        offset = f.tell()
+        for tx, ty in order_fn(grid_w, grid_h).tolist():
+            x0, y0 = tx * tile, ty * tile
+            tw, th = min(tile, width - x0), min(tile, height - y0)
+            if (tw, th) not in paths:
+                paths[(tw, th)] = order_fn(tw, th)
+            path = paths[(tw, th)]
+            block = as_u8(np.asarray(source[y0:y0 + th, x0:x0 + tw]))
+            payload = CODECS[codec](np.ascontiguousarray(block[path[:, 1], path[:, 0]]).tobytes(), level)
+            f.write(payload)
+            index[ty * grid_w + tx] = (offset, len(payload))
+            offset += len(payload)
+        # The index is only known once every tile is compressed.
+        f.seek(_HEADER.size)
+        f.write(index.tobytes())
+
+    return {"width": width, "height": height, "tiles": grid_w * grid_h,
+            "raw_bytes": width * height * channels, "file_bytes": offset}
+
+
+# ----------------------------
+# Random-access decoder
+# ----------------------------
+class SfcReader:
+    """
+    Memory-mapped `.sfc` file. `read_region` decompresses only the tiles that overlap
+    the requested rectangle; nothing else of the file is read.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise
+        magic, version, channels, width, height, tile, curve, codec = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} .sfc file")
+        self.width, self.height, self.channels, self.tile = width, height, channels, tile
+        self.curve = curve.rstrip(b"\0").decode("ascii")
+        self.codec = codec.rstrip(b"\0").decode("ascii")
+        self.grid_w, self.grid_h = -(-width // tile), -(-height // tile)
+        self.index = np.frombuffer(self._map, dtype=_INDEX_DTYPE, count=self.grid_w * self.grid_h,
+                                   offset=_HEADER.size)
+        self._paths: dict[tuple[int, int], np.ndarray] = {}
+
+    def close(self) -> None:
+        if not self._map.closed:
+            # The index view must go before the map it points into.
+            self.index = None
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> SfcReader:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def shape(self) -> tuple[int, ...]:
+        return (self.height, self.width) if self.channels == 1 else (self.height, self.width, self.channels)
+
+    def read_tile(self, tx: int, ty: int) -> np.ndarray:
+        """
+        Decompress tile (tx, ty) as an (th, tw) or (th, tw, c) uint8 array.
+        """
+        tw = min(self.tile, self.width - tx * self.tile)
+        th = min(self.tile, self.height - ty * self.tile)
+        offset, length = self.index[ty * self.grid_w + tx].tolist()
+        data = DECOMPRESSORS[self.codec](self._map[offset:offset + length])
+        if (tw, th) not in self._paths:
+            self._paths[(tw, th)] = get_curve(self.curve).order(tw, th)
+        path = self._paths[(tw, th)]
+        block = np.empty((th, tw, self.channels), dtype=np.uint8)
+        block[path[:, 1], path[:, 0]] = np.frombuffer(data, dtype=np.uint8).reshape(-1, self.channels)
+        return block[:, :, 0] if self.channels == 1 else block
+
+    def read_region(self, x: int, y: int, width: int, height: int) -> np.ndarray:
+        """
+        Pixels of the rectangle [x, x + width) x [y, y + height), clipped to the image.
+        """
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.width, x + width), min(self.height, y + height)
+        out = np.zeros((max(0, y1 - y0), max(0, x1 - x0)) + self.shape[2:], dtype=np.uint8)
+        if out.size == 0:
+            return out
+        t = self.tile
+        for ty in range(y0 // t, (y1 - 1) // t + 1):
+            for tx in range(x0 // t, (x1 - 1) // t + 1):
+                block = self.read_tile(tx, ty)
+                bx0, by0 = max(x0, tx * t), max(y0, ty * t)
+                bx1, by1 = min(x1, tx * t + block.shape[1]), min(y1, ty * t + block.shape[0])
+                out[by0 - y0:by1 - y0, bx0 - x0:bx1 - x0] = block[by0 - ty * t:by1 - ty * t,
+                                                                  bx0 - tx * t:bx1 - tx * t]
+        return out
+
+    def read(self) -> np.ndarray:
+        return self.read_region(0, 0, self.width, self.height)
+
+
+def decode_sfc(path: str | Path, region: tuple[int, int, int, int] | None = None) -> np.ndarray:
+    """
+    Decode a whole `.sfc` file, or only `region = (x, y, width, height)`.
+    """
+    with SfcReader(path) as reader:
+        return reader.read() if region is None else reader.read_region(*region)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from src.curves.registry import DEFAULT_CHUNK, get_curve
+from src.processing.diffusion_plan import KERNELS, build_plan, run_plan
+from src.processing.riemersma import QUEUE_LENGTH, WEIGHT_RATIO, RiemersmaQueue
+
+
+# ----------------------------
+# Out-of-core error diffusion
+# ----------------------------
+# The image is cut into tiles that are visited along a space-filling curve, and
+# each tile is dithered along the same curve. A tile is processed in a small
+# frame that extends it by the reach of the kernel: error that falls into the
+# frame margin belongs to a neighbouring tile. It is kept in a per-tile
+# boundary buffer if that tile is still to come, and dropped otherwise, exactly
+# as the in-memory dithering drops error pushed onto already visited pixels.
+# The result is therefore identical to dithering the whole image along the
+# concatenated path, while only one tile and the buffers are ever in memory.
+RAW_SUFFIXES = {".raw", ".gray", ".bin", ".u8"}
+
+
+# ----------------------------
+# Sources
+# ----------------------------
+def open_grayscale_source(path: str | Path, shape: tuple[int, int] | None = None) -> np.ndarray:
+    """
+    Open a grayscale image as a read-only (height, width) array without loading it.
+
+    - `.npy` files are memory-mapped with `np.load(mmap_mode="r")`.
+    - Raw 8-bit files (`.raw`, `.gray`, `.bin`, `.u8`) are memory-mapped; `shape` is required.
+    - Other files go through PIL. Uncompressed single-strip 8-bit images (PGM, TIFF, ...)
+      are memory-mapped at their pixel offset; anything else (PNG, JPEG, ...) has to be
+      decoded by PIL and is loaded in full.
+    """
+    path = Path(path)
+    if path.suffix == ".npy":
+        return np.load(path, mmap_mode="r")
+    if path.suffix in RAW_SUFFIXES:
+        if shape is None:
+            raise ValueError(f"raw source {path} needs an explicit (height, width) shape")
+        return np.memmap(path, dtype=np.uint8, mode="r", shape=shape)
+
+    with Image.open(path) as img:
+        width, height = img.size
+        tile = img.tile[0] if len(img.tile) == 1 else None
+        if img.mode == "L" and tile is not None and tile[0] == "raw":
+            args = tile[3] if isinstance(tile[3], tuple) else (tile[3],)
+            stride = args[1] if len(args) > 1 else 0
+            orientation = args[2] if len(args) > 2 else 1
+            if args[0] == "L" and stride in (0, width) and orientation == 1 and tile[1] == (0, 0, width, height):
+                return np.memmap(path, dtype=np.uint8, mode="r", offset=tile[2], shape=(height, width))
+        return np.asarray(img.convert("L"))
+
+
+def _as_unit(block: np.ndarray) -> np.ndarray:
+    if block.dtype == np.uint8:
+        return block.astype(np.float64) / 255.0
+    return block.astype(np.float64)
+
+
+# ----------------------------
+# Sink
+# ----------------------------
+def _open_pbm(path: Path, width: int, height: int) -> np.memmap:
+    """
+    Create a binary PBM (P4) file of the right size and map its packed rows for writing.
+    """
+    header = f"P4\n{width} {height}\n".encode("ascii")
+    row_bytes = (width + 7) // 8
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(header)
+        f.truncate(len(header) + row_bytes * height)
+    return np.memmap(path, dtype=np.uint8, mode="r+", offset=len(header), shape=(height, row_bytes))
+
+
+# ----------------------------
+# Tile frames
+# ----------------------------
+def kernel_reach(kernel: str) -> tuple[int, int, int, int]:
+    """
+    How far `kernel` pushes error (left, top, right, bottom): the margins of a tile frame.
+    """
+    offsets = np.array([(dx, dy) for dx, dy, _ in KERNELS[kernel]])
+    return (max(0, -int(offsets[:, 0].min())), max(0, -int(offsets[:, 1].min())),
+            max(0, int(offsets[:, 0].max())), max(0, int(offsets[:, 1].max())))
+
+
+def frame_plan(curve: str, tw: int, th: int, kernel: str) -> tuple:
+    """
+    Diffusion plan of a tw x th tile visited along `curve`, inside a frame extended by the
+    reach of the kernel, with the (x, y) of the frame margin cells relative to the tile and
+    their flat indices in the frame.
+    """
+    left, top, right, bottom = kernel_reach(kernel)
+    fw, fh = tw + left + right, th + top + bottom
+    path = get_curve(curve).order(tw, th) + np.array([left, top], dtype=np.int32)
+    fy, fx = np.mgrid[0:fh, 0:fw]
+    margin = ~((fx >= left) & (fx < left + tw) & (fy >= top) & (fy < top + th))
+    return build_plan(path, fw, fh, kernel), fx[margin] - left, fy[margin] - top, np.flatnonzero(margin.ravel())
+
+
+# ----------------------------
+# Streaming dithering
+# ----------------------------
+def stream_dither(source: np.ndarray, output_path: str | Path, tile: int = 512,
+                  curve: str = "gilbert", kernel: str = "atkinson", threshold: float = 0.5) -> dict:
+    """
+    Dither a (height, width) grayscale source (uint8, or float in [0, 1]) tile by tile and
+    write the 1-bit result incrementally to a PBM file.
+
+    `tile` must be a multiple of 8 so that every tile covers whole bytes of the packed rows.
+    Returns a small summary: image size, number of tiles, and the largest number of boundary
+    error entries that were buffered at once.
+    """
+    if tile <= 0 or tile % 8:
+        raise ValueError(f"tile size must be a positive multiple of 8, got {tile}")
+    if get_curve(curve).dims != 2:
+        raise ValueError(f"{curve!r} is not a 2D curve")
+    height, width = source.shape
+    left, top, right, bottom = kernel_reach(kernel)
+
+    grid_w, grid_h = -(-width // tile), -(-height // tile)
+    done = np.zeros((grid_h, grid_w), dtype=bool)
+    pending: dict[tuple[int, int], list[tuple[np.ndarray, np.ndarray, np.ndarray]]] = {}
+    plans: dict[tuple[int, int], tuple] = {}
+    sink = _open_pbm(Path(output_path), width, height)
+    buffered = peak_buffered = 0
+
+    for tx, ty in get_curve(curve).order(grid_w, grid_h).tolist():
+        x0, y0 = tx * tile, ty * tile
+        tw, th = min(tile, width - x0), min(tile, height - y0)
+        fw, fh = tw + left + right, th + top + bottom
+
+        if (tw, th) not in plans:
+            # One plan per tile shape: interior, right edge, bottom edge, corner.
+            plans[(tw, th)] = frame_plan(curve, tw, th, kernel)
+        plan, margin_x, margin_y, margin_idx = plans[(tw, th)]
+
+        work = np.zeros((fh, fw), dtype=np.float64)
+        work[top:top + th, left:left + tw] = _as_unit(np.asarray(source[y0:y0 + th, x0:x0 + tw]))
+        for ys, xs, vals in pending.pop((tx, ty), ()):
+            np.add.at(work, (ys - y0 + top, xs - x0 + left), vals)
+            buffered -= len(vals)
+
+        flat = work.ravel().tolist()
+        out = bytearray(fw * fh)
+        run_plan(plan, flat, out, threshold)
+        done[ty, tx] = True
+
+        bits = np.frombuffer(out, dtype=np.uint8).reshape(fh, fw)[top:top + th, left:left + tw]
+        # PBM stores black as 1.
+        sink[y0:y0 + th, x0 // 8:x0 // 8 + (tw + 7) // 8] = np.packbits(1 - bits, axis=1)
+
+        # Hand the error left in the frame margin to the tiles that are still to come.
+        residual = np.asarray(flat)[margin_idx]
+        gx, gy = margin_x + x0, margin_y + y0
+        keep = (residual != 0) & (gx >= 0) & (gx < width) & (gy >= 0) & (gy < height)
+        gx, gy, residual = gx[keep], gy[keep], residual[keep]
+        owner_x, owner_y = gx // tile, gy // tile
+        keep = ~done[owner_y, owner_x]
+        gx, gy, residual, owner_x, owner_y = gx[keep], gy[keep], residual[keep], owner_x[keep], owner_y[keep]
+        owners = owner_y * grid_w + owner_x
+        for owner in np.unique(owners):
+            sel = owners == owner
+            pending.setdefault((int(owner % grid_w), int(owner // grid_w)), []).append((gy[sel], gx[sel], residual[sel]))
+            buffered += int(sel.sum())
+        peak_buffered = max(peak_buffered, buffered)
+
+    sink.flush()
+    del sink
+    return {"width": width, "height": height, "tiles": grid_w * grid_h, "peak_buffered": peak_buffered}
+
+
+def stream_riemersma(source: np.ndarray, output_path: str | Path, curve: str = "hilbert",
+                     length: int = QUEUE_LENGTH, ratio: float = WEIGHT_RATIO, threshold: float = 0.5,
+                     chunk: int = DEFAULT_CHUNK) -> dict:
+    """
+    Riemersma dithering of a (height, width) grayscale source straight to a PBM file: the
+    traversal is generated `chunk` points at a time, those pixels are read, dithered with
+    the carried error history and their bits set in the output. No tiles, frames or boundary
+    buffers are needed, since no error is ever written back to the image.
+    """
+    if get_curve(curve).dims != 2:
+        raise ValueError(f"{curve!r} is not a 2D curve")
+    height, width = source.shape
+    queue = RiemersmaQueue(length, ratio, threshold)
+    sink = _open_pbm(Path(output_path), width, height)
+    chunks = 0
+    for points in get_curve(curve).iter_order(width, height, chunk=chunk):
+        x, y = points[:, 0], points[:, 1]
+        # PBM stores black as 1.
+        black = queue.dither(_as_unit(np.asarray(source[y, x]))) == 0
+        x, y = x[black], y[black]
+        np.bitwise_or.at(sink, (y, x >> 3), (0x80 >> (x & 7)).astype(np.uint8))
+        chunks += 1
+
+    sink.flush()
+    del sink
+    return {"width": width, "height": height, "chunks": chunks, "history": length}
+
+
+def stream_dither_file(input_path: str | Path, output_path: str | Path,
+                       shape: tuple[int, int] | None = None, method: str = "diffusion", **kwargs) -> dict:
+    """
+    `stream_dither` on a file opened with `open_grayscale_source`; `method="riemersma"`
+    runs `stream_riemersma` instead.
+    """
+    if method not in ("diffusion", "riemersma"):
+        raise ValueError(f"unknown method {method!r}, expected 'diffusion' or 'riemersma'")
+    run = stream_riemersma if method == "riemersma" else stream_dither
+    return run(open_grayscale_source(input_path, shape), output_path, **kwargs)
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+
+from batch_pipeline import collect_images, parse_size
+from main_pipeline import load_grayscale_image
+from src.curves.path_cache import cached_path
+from src.curves.registry import curve_names, curve_version, get_curve
+from src.metrics.compression_matrix import CODECS, as_u8, compressed_size
+from src.metrics.entropy_engine import conditional_entropy, entropy_bits_per_symbol
+from src.processing.diffusion_plan import KERNELS, apply_plan, get_plan
+from src.processing.riemersma import riemersma_dither
+
+
+# ----------------------------
+# Grid
+# ----------------------------
+# A sweep is the product images x curves x kernels x codecs, declared in a JSON
+# file (or on the command line) instead of in each experiment script. Kernels
+# are the diffusion kernels, "riemersma" (error carried along the curve) and
+# "none" (the 8-bit grayscale image itself). Codecs are "name:level".
+#
+# Every cell has a key: a digest of the image file, the resize, the curve, the
+# kernel, the codec and the code version of the cell, i.e. the sources of the
+# modules that implement its curve (and the registry), the image loading, its
+# kernel and codec, plus this runner. Cells
+# whose key is already in the SQLite store are skipped, so adding a curve to
+# the grid computes only the new column, and editing peano_vec.py recomputes
+# only the Peano cells (and rebuilds their cached paths, which are keyed by the
+# same code version). Rows are appended, never updated: the store keeps the
+# results of every code version.
+DEFAULT_GRID = {
+    "images": ["data/input"],
+    "size": None,
+    "curves": ["hilbert", "gilbert", "raster"],
+    "kernels": ["atkinson", "floyd_steinberg"],
+    "codecs": ["gzip:9", "zlib:6", "bz2:9", "lzma:6"],
+}
+DEFAULT_DB = Path("data/output/sweep.sqlite")
+SPECIAL_KERNELS = ("none", "riemersma")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    cell_key TEXT NOT NULL,
+    image TEXT NOT NULL,
+    image_digest TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    curve TEXT NOT NULL,
+    kernel TEXT NOT NULL,
+    codec TEXT NOT NULL,
+    level INTEGER NOT NULL,
+    code_version TEXT NOT NULL,
+    raw_bytes INTEGER NOT NULL,
+    compressed_bytes INTEGER NOT NULL,
+    ratio REAL NOT NULL,
+    bits_per_pixel REAL NOT NULL,
+    entropy_order0 REAL NOT NULL,
+    entropy_order1 REAL NOT NULL,
+    dither_seconds REAL NOT NULL,
+    compress_seconds REAL NOT NULL,
+    created TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_cell_key ON results (cell_key);
+"""
+
+
+def load_grid(path: str | Path | None = None, **overrides) -> dict:
+    """
+    The grid of a JSON file (missing entries from `DEFAULT_GRID`), with non-None overrides applied.
+    Raises ValueError on unknown curves, kernels or codecs.
+    """
+    grid = dict(DEFAULT_GRID)
+    if path is not None:
+        grid.update(json.loads(Path(path).read_text(encoding="utf-8")))
+    grid.update({name: value for name, value in overrides.items() if value is not None})
+    unknown = [c for c in grid["curves"] if c not in curve_names(2)]
+    unknown += [k for k in grid["kernels"] if k not in KERNELS and k not in SPECIAL_KERNELS]
+    unknown += [c for c in grid["codecs"] if parse_codec(c)[0] not in CODECS]
+    if unknown:
+        raise ValueError(f"unknown curve/kernel/codec: {', '.join(unknown)}")
+    return grid
+
+
+def parse_codec(text: str) -> tuple[str, int]:
+    name, _, level = text.partition(":")
+    return name, int(level) if level else 9
+
+
+# ----------------------------
+# Cell keys
+# ----------------------------
+_DIGESTS: dict[str, str] = {}
+
+
+def _file_digest(path: str | Path) -> str:
+    path = str(path)
+    if path not in _DIGESTS:
+        _DIGESTS[path] = hashlib.blake2b(Path(path).read_bytes(), digest_size=16).hexdigest()
+    return _DIGESTS[path]
+
+
+def code_version(curve: str, kernel: str) -> str:
+    """
+    Digest of the sources a (curve, kernel) cell runs: the curve's implementation and the
+    registry (`curve_version`), the image loading and resizing, the kernel's module, the
+    codec and entropy modules and this runner.
+    """
+    kernel_fn = {"none": None, "riemersma": riemersma_dither}.get(kernel, apply_plan)
+    modules = [run_cells, load_grayscale_image, parse_size, compressed_size, conditional_entropy]
+    if kernel_fn is not None:
+        modules.append(kernel_fn)
+    digests = curve_version(curve) + "".join(_file_digest(inspect.getsourcefile(fn)) for fn in modules)
+    return hashlib.blake2b(digests.encode(), digest_size=16).hexdigest()
+
+
+def cell_key(image_digest: str, size: str | None, curve: str, kernel: str, codec: str, version: str) -> str:
+    text = json.dumps([image_digest, size, curve, kernel, codec, version])
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+# ----------------------------
+# Worker
+# ----------------------------
+def run_cells(job: tuple[str, str, str | None, str, str, tuple[tuple[str, str], ...], str]) -> list[dict]:
+    """
+    Pool worker: dither one image along one curve with one kernel, read it back along the
+    curve and compress that payload with every codec of the job. Returns one record per
+    codec. "none" serializes 8-bit pixels, the other kernels 1-bit pixels packed 8 per byte.
+    """
+    image_path, image_digest, size, curve, kernel, codecs, version = job
+    image = load_grayscale_image(image_path, size=parse_size(size) if size else None)
+    h, w = image.shape
+    path = cached_path(curve, w, h, get_curve(curve).order, version=version)
+
+    start = time.perf_counter()
+    if kernel == "none":
+        pixels, alphabet = as_u8(image), 256
+    elif kernel == "riemersma":
+        pixels, alphabet = riemersma_dither(image, curve).astype(np.uint8), 2
+    else:
+        pixels, alphabet = apply_plan(get_plan(path, w, h, kernel), image).astype(np.uint8), 2
+    dither_seconds = time.perf_counter() - start
+
+    coords = np.asarray(path, dtype=np.intp)
+    sequence = pixels[coords[:, 1], coords[:, 0]]
+    payload = (sequence if alphabet == 256 else np.packbits(sequence)).tobytes()
+    entropy0 = float(entropy_bits_per_symbol(sequence, alphabet))
+    entropy1 = float(conditional_entropy(sequence, 1, alphabet))
+
+    records = []
+    for codec, key in codecs:
+        name, level = parse_codec(codec)
+        start = time.perf_counter()
+        size_bytes = compressed_size(payload, name, level)
+        records.append({
+            "cell_key": key, "image": image_path, "image_digest": image_digest, "width": w, "height": h,
+            "curve": curve, "kernel": kernel, "codec": name, "level": level, "code_version": version,
+            "raw_bytes": len(payload), "compressed_bytes": size_bytes,
+            "ratio": len(payload) / size_bytes if size_bytes else 0.0,
+            "bits_per_pixel": 8 * size_bytes / (w * h),
+            "entropy_order0": entropy0, "entropy_order1": entropy1,
+            "dither_seconds": dither_seconds, "compress_seconds": time.perf_counter() - start,
+        })
+    return records
+
+
+# ----------------------------
+# Store and scheduling
+# ----------------------------
+def open_store(path: str | Path) -> sqlite3.Connection:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA)
+    return db
+
+
+def plan_jobs(grid: dict, done: set[str]) -> tuple[list[tuple], int]:
+    """
+    Jobs for the cells of `grid` whose key is not in `done`, one job per (image, curve, kernel)
+    with its missing codecs. Returns the jobs and the number of cells in the grid.
+    """
+    jobs, cells = [], 0
+    for image in collect_images(grid["images"]):
+        digest = _file_digest(image)
+        for curve in grid["curves"]:
+            for kernel in grid["kernels"]:
+                version = code_version(curve, kernel)
+                missing = []
+                for codec in grid["codecs"]:
+                    key = cell_key(digest, grid["size"], curve, kernel, codec, version)
+                    cells += 1
+                    if key not in done:
+                        missing.append((codec, key))
+                if missing:
+                    jobs.append((str(image), digest, grid["size"], curve, kernel, tuple(missing), version))
+    return jobs, cells
+
+
+def run_sweep(grid: dict, db_path: str | Path = DEFAULT_DB, workers: int = 1, force: bool = False,
+              log=sys.stderr) -> dict:
+    """
+    Compute the missing cells of `grid` in a pool of `workers` processes and append their rows
+    to the SQLite store; `force` recomputes every cell. Returns cell counts and wall time.
+    """
+    start = time.perf_counter()
+    db = open_store(db_path)
+    try:
+        done = set() if force else {key for (key,) in db.execute("SELECT cell_key FROM results")}
+        jobs, cells = plan_jobs(grid, done)
+        computed = 0
+        columns = None
+
+        def store(records: list[dict]) -> None:
+            nonlocal computed, columns
+            created = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+            for record in records:
+                record["created"] = created
+                columns = columns or list(record)
+                db.execute(f"INSERT INTO results ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                           [record[c] for c in columns])
+            db.commit()
+            computed += len(records)
+            if log is not None and records:
+                r = records[0]
+                print(f"{Path(r['image']).name:<24} {r['curve']:<10} {r['kernel']:<16} {len(records)} cell(s)",
+                      file=log, flush=True)
+
+        if workers <= 1 or len(jobs) <= 1:
+            for records in map(run_cells, jobs):
+                store(records)
+        else:
+            with Pool(processes=min(workers, len(jobs))) as pool:
+                for records in pool.imap_unordered(run_cells, jobs):
+                    store(records)
+    finally:
+        db.close()
+    return {"cells": cells, "computed": computed, "skipped": cells - computed,
+            "seconds": time.perf_counter() - start}
+
+
+# ----------------------------
+# Entry point
+# ----------------------------
+def _csv(text: str) -> list[str]:
+    return [item.strip() for item in text.split(",") if item.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run an image x curve x kernel x codec sweep into SQLite, "
+                                                 "computing only the cells that changed.")
+    parser.add_argument("grid", nargs="?", type=Path, default=None, help="JSON grid (default: built-in grid)")
+    parser.add_argument("-i", "--images", type=_csv, default=None, help="comma-separated directories or globs")
+    parser.add_argument("-c", "--curves", type=_csv, default=None, help=f"among {', '.join(curve_names(2))}")
+    parser.add_argument("-k", "--kernels", type=_csv, default=None,
+                        help=f"among {', '.join((*KERNELS, *SPECIAL_KERNELS))}")
+    parser.add_argument("-z", "--codecs", type=_csv, default=None,
+                        help=f"codec:level among {', '.join(CODECS)} (e.g. gzip:9,lzma:6)")
+    parser.add_argument("--size", default=None, help="resize every image to WIDTHxHEIGHT first")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB, help=f"SQLite store (default: {DEFAULT_DB})")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: number of CPUs)")
+    parser.add_argument("--force", action="store_true", help="recompute cells that are already stored")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        grid = load_grid(args.grid, images=args.images, curves=args.curves, kernels=args.kernels,
+                         codecs=args.codecs, size=args.size)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    summary = run_sweep(grid, args.db, args.workers, args.force)
+    print(f"{summary['computed']} cell(s) computed, {summary['skipped']} already stored, "
+          f"in {summary['seconds']:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())